@@ -0,0 +1,91 @@
+import time
+import weakref
+
+# Update tiers and how many ticks apart their thinking is spread
+NEAR = 0
+MID = 1
+FAR = 2
+TIER_INTERVALS = {NEAR: 1, MID: 3, FAR: 8}
+
+NEAR_DISTANCE = 300
+MID_DISTANCE = 700
+
+# Actions that always need a fresh decision every tick
+ENGAGED_ACTIONS = ("attack",)
+
+AI_BUDGET_MS = 1.0
+REPLAY_MAX_THINKS = 4  # per tick while recording; replays restore it with the first keyframe
+
+
+class AIScheduler:
+    # Spreads enemy decisions across ticks by relevance and caps their cost per tick.
+    # Physics, animation and timers are not scheduled; only Enemy.ai_think is.
+    def __init__(self, budget_ms=AI_BUDGET_MS, max_thinks=None):
+        self.budget = budget_ms / 1000 if budget_ms is not None else None
+        self.max_thinks = max_thinks  # a tick-count budget keeps replays deterministic
+        self.tick = 0
+        self.last_think = weakref.WeakKeyDictionary()
+        self.thinks = 0
+        self.deferred = 0
+        self.registered = 0
+
+    def tier_for(self, enemy, player):
+        # Close, airborne or attacking enemies think every tick; far idle ones rarely
+        if enemy.current_action in ENGAGED_ACTIONS or enemy.is_jumping or enemy.current_state == "attack":
+            return NEAR
+        distance = abs(player.rect.centerx - enemy.rect.centerx)
+        if distance < NEAR_DISTANCE:
+            return NEAR
+        if distance < MID_DISTANCE and enemy.current_action != "idle":
+            return MID
+        return FAR
+
+    def run(self, enemies, player):
+        self.tick += 1
+        due = []
+        for enemy in enemies:
+            interval = TIER_INTERVALS[self.tier_for(enemy, player)]
+            # New enemies start staggered so a wave does not think in lockstep
+            last = self.last_think.get(enemy)
+            if last is None:
+                last = self.tick - 1 - self.registered % interval
+                self.registered += 1
+                self.last_think[enemy] = last
+            waited = self.tick - last
+            if waited >= interval:
+                due.append((waited / interval, enemy))
+
+        # Most overdue first, so deferred work is carried forward fairly
+        due.sort(key=lambda item: item[0], reverse=True)
+        start = time.perf_counter()
+        for count, (lateness, enemy) in enumerate(due):
+            if count and self.over_budget(count, start):
+                self.deferred += len(due) - count
+                break
+            enemy.ai_think(player)
+            self.last_think[enemy] = self.tick
+            self.thinks += 1
+
+    def over_budget(self, count, start):
+        # At least one enemy thinks each tick, so nobody starves
+        if self.max_thinks is not None:
+            return count >= self.max_thinks
+        return self.budget is not None and time.perf_counter() - start > self.budget
+
+    def capture_state(self, enemies):
+        # Per-enemy bookkeeping is stored in the order of the enemy list
+        return {"tick": self.tick, "registered": self.registered, "max_thinks": self.max_thinks,
+                "last_think": [self.last_think.get(enemy) for enemy in enemies]}
+
+    def restore_state(self, state, enemies):
+        self.tick = state["tick"]
+        self.registered = state["registered"]
+        # A recorded match re-simulates under the same tick-count budget it was played with
+        self.max_thinks = state.get("max_thinks", self.max_thinks)
+        self.last_think = weakref.WeakKeyDictionary()
+        for enemy, last in zip(enemies, state["last_think"]):
+            if last is not None:
+                self.last_think[enemy] = last
+
+    def summary(self):
+        return f"AI scheduler: {self.thinks} thinks over {self.tick} ticks, {self.deferred} deferred"
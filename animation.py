@@ -1,13 +1,93 @@
 import pygame
+from render_queue import use_rle
+from asset_memory import memory
+from settings import RLE_SPRITES
 
 class Animation:
-    def __init__(self, frames, speed=10, loop=True):
-        self.frames = frames
+    def __init__(self, frames, speed=10, loop=True, boxes=None):
         self.speed = speed  
         self.loop = loop
         self.current_frame = 0
         self.done = False
         self.frame_counter = 0
+        self.boxes = boxes or {}
+        self.owner = None
+        self.set_frames([trim_frame(frame) for frame in frames])
+    
+    def set_frames(self, trimmed):
+        # Takes (surface, full size, offset) entries from trim_frame. Frames are stored
+        # cropped to their opaque pixels; sizes and offsets keep the full-frame geometry,
+        # which boxes, placement and collision are all expressed in.
+        self.frames = [surface for surface, _, _ in trimmed]
+        self.sizes = [size for _, size, _ in trimmed]
+        self.offsets = {True: [], False: []}
+        for surface, size, offset in trimmed:
+            self.offsets[True].append(offset)
+            self.offsets[False].append((size[0] - offset[0] - surface.get_width(), offset[1]))
+        self.build_collision_data()
+        if self.owner:
+            self.track(self.owner)
+    
+    def track(self, owner):
+        # Count the frames, and any that replace them later, against the asset budget
+        self.owner = owner
+        for frame in self.frames:
+            memory.track(frame, owner, "animation")
+    
+    def trimmed(self):
+        # The entries set_frames was given, e.g. to keep unchanged frames on reload
+        return [(frame, size, offset) for frame, size, offset in zip(self.frames, self.sizes, self.offsets[True])]
+    
+    def build_collision_data(self):
+        # Masks, hurtboxes and hitboxes for every frame and facing, computed once at load.
+        # Boxes are in full-frame pixels for the right-facing sprite; left-facing ones are mirrored.
+        # Masks cover only the trimmed pixels and start at the frame's offset.
+        self.masks = {True: [], False: []}
+        self.hurtboxes = {True: [], False: []}
+        self.hitboxes = {True: [], False: []}
+        self.has_hitboxes = any(data.get("hitbox") for data in self.boxes.values())
+        
+        for index, frame in enumerate(self.frames):
+            width = self.sizes[index][0]
+            data = self.boxes.get(index, {})
+            mask = pygame.mask.from_surface(frame)
+            
+            hurtbox = data.get("hurtbox")
+            if hurtbox:
+                hurtbox = pygame.Rect(hurtbox)
+            else:
+                # Derive the hurtbox from the opaque pixels of the sprite
+                bounds = mask.get_bounding_rects()
+                hurtbox = bounds[0].unionall(bounds[1:]) if bounds else frame.get_rect()
+                hurtbox = hurtbox.move(self.offsets[True][index])
+            hitbox = pygame.Rect(data["hitbox"]) if data.get("hitbox") else None
+            
+            self.masks[True].append(mask)
+            self.masks[False].append(pygame.mask.from_surface(pygame.transform.flip(frame, True, False)))
+            self.hurtboxes[True].append(hurtbox)
+            self.hurtboxes[False].append(mirror_rect(hurtbox, width))
+            self.hitboxes[True].append(hitbox)
+            self.hitboxes[False].append(mirror_rect(hitbox, width) if hitbox else None)
+    
+    def frame_rect(self, index, center):
+        # Where the full, untrimmed frame sits when it is centred on a point
+        rect = pygame.Rect((0, 0), self.sizes[index])
+        rect.center = center
+        return rect
+    
+    def sprite_position(self, index, facing_right, center, scale=1):
+        # Top-left of the trimmed frame so it lands where the centred full frame would,
+        # optionally for a frame scaled by `scale` around a scaled centre
+        width, height = self.sizes[index]
+        offset_x, offset_y = self.offsets[facing_right][index]
+        return (center[0] - max(1, round(width * scale)) // 2 + round(offset_x * scale),
+                center[1] - max(1, round(height * scale)) // 2 + round(offset_y * scale))
+    
+    def memory(self):
+        # Pixel bytes of the frames as loaded and as stored after trimming
+        full = sum(width * height * 4 for width, height in self.sizes)
+        trimmed = sum(frame.get_width() * frame.get_height() * frame.get_bytesize() for frame in self.frames)
+        return full, trimmed
     
     def update(self):
         if not self.done:
@@ -28,10 +108,52 @@ class Animation:
             return self.frames[self.current_frame]
         return None
     
+    def get_frame(self, index):
+        # A frame by index, e.g. from a render snapshot; a reload may have shortened the list
+        if self.frames:
+            return self.frames[min(index, len(self.frames) - 1)]
+        return None
+    
     def reset(self):
         self.current_frame = 0
         self.frame_counter = 0
         self.done = False
     
+    def capture_state(self):
+        return (self.current_frame, self.frame_counter, self.done)
+
+    def restore_state(self, state):
+        self.current_frame, self.frame_counter, self.done = state
+    
     def is_finished(self):
         return self.done and not self.loop
+
+
+def trim_frame(frame):
+    # Crop a frame to its opaque pixels: (surface, full size, offset of the crop)
+    size = frame.get_size()
+    bounds = frame.get_bounding_rect()
+    if not bounds.width or not bounds.height:
+        bounds = pygame.Rect(0, 0, 1, 1)
+    if bounds.size != size:
+        frame = frame.subsurface(bounds).copy()
+    if RLE_SPRITES:
+        use_rle(frame)
+    return frame, size, bounds.topleft
+
+
+def memory_report(name, states):
+    # One line per animation set, e.g. after loading a fighter
+    full = trimmed = 0
+    for animation in states.values():
+        before, after = animation.memory()
+        full += before
+        trimmed += after
+    saved = full - trimmed
+    percent = saved * 100 // full if full else 0
+    return f"{name}: frames {full // 1024} KB -> {trimmed // 1024} KB after trimming ({percent}% saved)"
+
+
+def mirror_rect(rect, width):
+    # Reflect a frame-local rect horizontally inside a frame of the given width
+    return pygame.Rect(width - rect.right, rect.y, rect.width, rect.height)
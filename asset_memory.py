@@ -0,0 +1,183 @@
+import argparse
+import csv
+import sys
+import weakref
+import pygame
+from settings import ASSET_BUDGET_MB
+
+LOW_WATER = 0.9  # evicting stops once usage is back under this fraction of the budget
+
+
+def surface_bytes(surface):
+    # Subsurfaces share their parent's pixels and cost nothing extra
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def surface_format(surface):
+    flags = surface.get_flags()
+    text = f"{surface.get_bitsize()}-bit"
+    if surface.get_masks()[3]:
+        text += " per-pixel alpha"
+    elif surface.get_alpha() is not None:
+        text += " surface alpha"
+    if flags & (pygame.RLEACCEL | pygame.RLEACCELOK):
+        text += " RLE"
+    if surface.get_parent() is not None:
+        text += " view"
+    return text
+
+
+class AssetMemory:
+    # Pixel memory of every tracked Surface, by owner and kind. Entries go away with
+    # their surfaces, so totals are always live. Caches that can rebuild what they hold
+    # register an evictor; when tracking a surface puts usage over the budget, evictors
+    # are asked, cheapest to rebuild first, to free their coldest entries. Nothing drawn
+    # in the current frame is evicted, and when even evicting everything else could not
+    # get back under budget, nothing is evicted at all: it would only be rebuilt.
+    def __init__(self, budget=ASSET_BUDGET_MB << 20):
+        self.budget = budget
+        self.entries = {}  # id(surface) -> [weakref, owner, kind, bytes]
+        self.bytes = 0
+        self.peak = 0
+        self.evicted = 0
+        self.evictors = []  # (priority, name, weak evict, weak reclaimable), cheapest to rebuild first
+        self.enforcing = False
+        self.frame = 0  # bumped once per rendered frame, caches stamp their entries with it
+        self.over_budget = 0  # enforcements that could not get back under budget
+
+    def track(self, surface, owner, kind):
+        key = id(surface)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0]() is surface:
+            entry[1], entry[2] = owner, kind
+            return surface
+        size = surface_bytes(surface)
+        self.entries[key] = [weakref.ref(surface, lambda _, key=key: self.release(key)), owner, kind, size]
+        self.bytes += size
+        self.peak = max(self.peak, self.bytes)
+        if self.budget and self.bytes > self.budget:
+            self.enforce()
+        return surface
+
+    def release(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+
+    def next_frame(self):
+        self.frame += 1
+
+    def add_evictor(self, name, method, reclaimable, priority=0):
+        # `method(bytes)` frees at least that much of its coldest entries if it can, and
+        # `reclaimable()` says how much it could free right now. Both are held weakly,
+        # so a cache that is thrown away does not stay alive for this.
+        self.evictors.append((priority, name, weakref.WeakMethod(method), weakref.WeakMethod(reclaimable)))
+        self.evictors.sort(key=lambda evictor: evictor[0])
+
+    def enforce(self):
+        # Called from inside track(), possibly while a cache is building an entry
+        if self.enforcing:
+            return
+        self.enforcing = True
+        try:
+            target = int(self.budget * LOW_WATER)
+            evictors = []
+            for evictor in list(self.evictors):
+                evict, reclaimable = evictor[2](), evictor[3]()
+                if evict is None or reclaimable is None:
+                    self.evictors.remove(evictor)
+                else:
+                    evictors.append((evict, reclaimable))
+            if self.bytes - sum(reclaimable() for _, reclaimable in evictors) > self.budget:
+                self.warn_over_budget()
+                return
+            for evict, _ in evictors:
+                before = self.bytes
+                evict(self.bytes - target)
+                self.evicted += before - self.bytes
+                if self.bytes <= target:
+                    return
+            if self.bytes > self.budget:
+                self.warn_over_budget()
+        finally:
+            self.enforcing = False
+
+    def warn_over_budget(self):
+        # Only the first time; the summary has the count
+        if not self.over_budget:
+            print(f"Asset memory over budget with nothing left to evict: {self.bytes / 2**20:.1f} MB "
+                  f"of {self.budget / 2**20:.1f} MB")
+        self.over_budget += 1
+
+    def rows(self):
+        # (owner, kind, format, size, bytes) of every live surface, largest first
+        rows = []
+        for ref, owner, kind, size in list(self.entries.values()):
+            surface = ref()
+            if surface is not None:
+                rows.append((owner, kind, surface_format(surface), surface.get_size(), size))
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows
+
+    def by(self, field):
+        totals = {}
+        for row in self.rows():
+            totals[row[field]] = totals.get(row[field], 0) + row[4]
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def summary(self):
+        budget = f" of {self.budget / 2**20:.0f} MB budget" if self.budget else ""
+        return (f"Asset memory: {self.bytes / 2**20:.1f} MB in {len(self.entries)} surfaces{budget}, "
+                f"peak {self.peak / 2**20:.1f} MB, {self.evicted / 2**20:.1f} MB evicted, "
+                f"{self.over_budget} times over budget with nothing to evict")
+
+    def report(self, owners=10):
+        lines = [self.summary()]
+        lines += [f"  {kind:<16} {size / 2**20:8.2f} MB" for kind, size in self.by(1)]
+        lines.append("  Largest owners:")
+        lines += [f"    {owner:<40} {size / 2**20:8.2f} MB" for owner, size in self.by(0)[:owners]]
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("owner", "kind", "format", "width", "height", "bytes"))
+            for owner, kind, fmt, (width, height), size in self.rows():
+                writer.writerow((owner, kind, fmt, width, height, size))
+
+
+memory = AssetMemory()
+
+
+def report_command():
+    # Loads the game against the dummy display and reports what its assets cost
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game
+    from settings import RENDER_SIZE, parse_size
+    # Run as a script this module is __main__; the game tracks into the imported copy
+    from asset_memory import memory
+
+    parser = argparse.ArgumentParser(description="Report the memory used by the game's surfaces")
+    parser.add_argument("--dump", help="also write every tracked surface to this CSV file")
+    parser.add_argument("--size", help="render size, e.g. 640x360")
+    parser.add_argument("--frames", type=int, default=120, help="frames to render before reporting")
+    args = parser.parse_args()
+
+    size = parse_size(args.size, RENDER_SIZE)
+    game = Game(render_size=size, window_size=size)
+    for _ in range(args.frames):
+        game.update()
+        game.render_scene()
+    print(memory.report())
+    if args.dump:
+        memory.dump(args.dump)
+        print(f"Wrote {len(memory.entries)} surfaces to {args.dump}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(report_command())
@@ -0,0 +1,78 @@
+import time
+import pygame
+from settings import AUDIO_FREQUENCY, AUDIO_CHANNELS, AUDIO_BUFFER
+
+AUDIO_SIZE = -16  # signed 16-bit samples
+MIN_BUFFER = 256  # smaller buffers underrun once the game loop gets busy
+MIXER_CHANNELS = 16  # enough that an effect never waits for a free channel
+
+
+def init_mixer():
+    # Must run before pygame.init(); a fixed format means effects are converted once at load
+    buffer = max(MIN_BUFFER, AUDIO_BUFFER)
+    pygame.mixer.pre_init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, buffer)
+    pygame.mixer.init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, buffer)
+    pygame.mixer.set_num_channels(MIXER_CHANNELS)
+    sounds.buffer = buffer
+
+
+class PlayStats:
+    # Cost of play() calls, plus the delay until the mixer submits the next buffer
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def summary(self, buffer):
+        init = pygame.mixer.get_init()
+        if not init or not self.count:
+            return "Audio latency: no samples"
+        frequency = init[0]
+        period = buffer / frequency * 1000
+        call = self.total / self.count * 1000
+        # A sound started mid-period waits for the current buffer to finish, half a period on average
+        return (f"Audio latency: {self.count} plays, play() {call:.3f} ms mean / {self.worst * 1000:.3f} ms max, "
+                f"buffer {buffer} samples at {frequency} Hz, submit within {call + period / 2:.1f} ms "
+                f"mean / {self.worst * 1000 + period:.1f} ms worst")
+
+
+class EffectSound:
+    # A cached Sound whose play() calls are timed; everything else goes to the Sound
+    def __init__(self, sound, stats):
+        self.sound = sound
+        self.stats = stats
+
+    def play(self, *args, **kwargs):
+        started = time.perf_counter()
+        channel = self.sound.play(*args, **kwargs)
+        self.stats.add(time.perf_counter() - started)
+        return channel
+
+    def __getattr__(self, name):
+        return getattr(self.sound, name)
+
+
+class SoundBank:
+    # Effects decoded and resampled to the mixer format once, shared by everything that plays them
+    def __init__(self):
+        self.loaded = {}
+        self.latency = PlayStats()
+        self.buffer = AUDIO_BUFFER
+
+    def load(self, path, volume=1.0):
+        sound = self.loaded.get(path)
+        if sound is None:
+            sound = self.loaded[path] = EffectSound(pygame.mixer.Sound(path), self.latency)
+        sound.set_volume(volume)
+        return sound
+
+    def summary(self):
+        return self.latency.summary(self.buffer)
+
+
+sounds = SoundBank()
@@ -1,17 +1,33 @@
 import pygame
 import os
+from render_queue import BACKGROUND
+from asset_memory import memory, surface_bytes
+
+PARALLAX_NEAR = 0.75  # scroll speed of the nearest parallax layer relative to the stage
+PARALLAX_FAR = 0.25
+
 
 class Background:
-    def __init__(self, screen_width, screen_height):
+    folder = "assets/background"
+    parallax_folder = "assets/background/parallax"
+    
+    def __init__(self, screen_width, screen_height, stage_width=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
+        # Stage width in render pixels; stage images are kept this wide and never rescaled per frame
+        self.stage_width = max(screen_width, stage_width or screen_width)
         self.images = []
+        self.files = []  # source of each image; unused ones are unloaded when memory is short
+        self.layers = []
         self.current_bg_index = 0
+        self.visible = {}  # image -> (x, subsurface showing the screen at that scroll)
         self.load_backgrounds()
+        self.load_parallax()
+        memory.add_evictor("backgrounds", self.evict, self.reclaimable, priority=2)
         
     def load_backgrounds(self):
         #Load all background images from the assets/background folder
-        background_path = "assets/background"
+        background_path = self.folder
         
         if os.path.exists(background_path):
             # Get all image files 
@@ -22,13 +38,9 @@ class Background:
             for filename in image_files:
                 try:
                     image_path = os.path.join(background_path, filename)
-                    image = pygame.image.load(image_path).convert()
-                    
-                    # Scale image to fit screen if needed
-                    if image.get_width() != self.screen_width or image.get_height() != self.screen_height:
-                        image = pygame.transform.scale(image, (self.screen_width, self.screen_height))
-                    
-                    self.images.append(image)
+                    image = self.prepare(pygame.image.load(image_path))
+                    self.images.append(memory.track(image, image_path, "background"))
+                    self.files.append(image_path)
                     print(f"Loaded background: {filename}")
                     
                 except pygame.error as e:
@@ -40,14 +52,84 @@ class Background:
             print("No background images found. Creating fallback background.")
             fallback_bg = pygame.Surface((self.screen_width, self.screen_height))
             fallback_bg.fill((50, 50, 100))  # Dark blue color
-            self.images.append(fallback_bg)
+            self.images.append(memory.track(fallback_bg, "fallback", "background"))
+    
+    def prepare(self, image):
+        # Display format at stage size, so drawing is a plain blit of the visible part
+        image = image.convert()
+        
+        # Scale image to fit the stage if needed
+        if image.get_width() != self.stage_width or image.get_height() != self.screen_height:
+            image = pygame.transform.scale(image, (self.stage_width, self.screen_height))
+        return image
+    
+    def load_parallax(self):
+        # Optional transparent layers in front of the stage image, farthest first by file name
+        if not os.path.isdir(self.parallax_folder):
+            return
+        for filename in sorted(os.listdir(self.parallax_folder)):
+            if not filename.endswith(('.png', '.jpg', '.jpeg')):
+                continue
+            try:
+                path = os.path.join(self.parallax_folder, filename)
+                self.layers.append(memory.track(self.prepare_layer(pygame.image.load(path)), path, "parallax"))
+                print(f"Loaded parallax layer: {filename}")
+            except pygame.error as e:
+                print(f"Unable to load parallax layer: {filename}")
+                print(e)
+    
+    def layer_factor(self, index):
+        # Scroll speed of a layer, spread evenly from the farthest to the nearest
+        if len(self.layers) == 1:
+            return PARALLAX_NEAR
+        return PARALLAX_FAR + (PARALLAX_NEAR - PARALLAX_FAR) * index / (len(self.layers) - 1)
+    
+    def prepare_layer(self, image):
+        # Display format with alpha, at screen height and at least as wide as the nearest layer scrolls
+        image = image.convert_alpha()
+        width = max(round(image.get_width() * self.screen_height / image.get_height()),
+                    self.screen_width + round((self.stage_width - self.screen_width) * PARALLAX_NEAR))
+        if image.get_size() != (width, self.screen_height):
+            image = pygame.transform.smoothscale(image, (width, self.screen_height))
+        return image
     
     def get_current_background(self):
         #Get the current background image
         if self.images:
+            if self.images[self.current_bg_index] is None:
+                self.reload(self.current_bg_index)
             return self.images[self.current_bg_index]
         return None
     
+    def reload(self, index):
+        # Bring back an image that was unloaded to save memory
+        path = self.files[index]
+        try:
+            self.images[index] = memory.track(self.prepare(pygame.image.load(path)), path, "background")
+        except pygame.error as e:
+            print(f"Unable to reload background image: {path}")
+            print(e)
+            fallback_bg = pygame.Surface((self.screen_width, self.screen_height))
+            fallback_bg.fill((50, 50, 100))
+            self.images[index] = fallback_bg
+    
+    def unloadable(self):
+        # Backgrounds other than the one on screen; they load again when selected
+        return [index for index, image in enumerate(self.images)
+                if image is not None and index != self.current_bg_index and index < len(self.files)]
+    
+    def evict(self, size):
+        for index in self.unloadable():
+            if size <= 0:
+                return
+            image = self.images[index]
+            self.forget([image])
+            self.images[index] = None
+            size -= surface_bytes(image)
+    
+    def reclaimable(self):
+        return sum(surface_bytes(self.images[index]) for index in self.unloadable())
+    
     def next_background(self):
         # Switch to next background 
         if len(self.images) > 1:
@@ -58,8 +140,29 @@ class Background:
         if 0 <= index < len(self.images):
             self.current_bg_index = index
     
-    def draw(self, screen):
-        #Draw the background to the screen
+    def view_of(self, image, x):
+        # Screen-sized subsurface of an image at a scroll position; it shares the image's
+        # pixels, so nothing is copied and only the visible part is ever blitted
+        x = min(max(0, x), image.get_width() - self.screen_width)
+        if image.get_width() == self.screen_width:
+            return image
+        cached = self.visible.get(image)
+        if cached is None or cached[0] != x:
+            cached = self.visible[image] = (x, image.subsurface((x, 0, self.screen_width, self.screen_height)))
+        return cached[1]
+    
+    def draw(self, queue, view):
+        #Queue the background behind everything else
         current_bg = self.get_current_background()
+        # The stage image does not zoom; it scrolls with the centre of the camera
+        center = view.offset_x + view.width / (2 * view.world_scale)
+        scroll = round(center * view.scale - view.width / 2)
         if current_bg:
-            screen.blit(current_bg, (0, 0))
+            queue.submit(BACKGROUND, 0, self.view_of(current_bg, scroll), (0, 0))
+        for index, layer in enumerate(self.layers):
+            queue.submit(BACKGROUND, index + 1, self.view_of(layer, round(scroll * self.layer_factor(index))), (0, 0))
+    
+    def forget(self, images):
+        # Drop cached views of images that were replaced
+        for image in images:
+            self.visible.pop(image, None)
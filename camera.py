@@ -0,0 +1,76 @@
+from settings import WORLD_WIDTH, WORLD_HEIGHT, STAGE_WIDTH, STAGE_LEFT, CAMERA_ZOOM
+
+CAMERA_FOLLOW = 0.12  # fraction of the distance to the target covered per tick
+ZOOM_FOLLOW = 0.08  # same for the zoom
+CLOSE_RANGE = 220  # fighters closer than this are an exchange worth zooming in on
+ZOOM_CLOSE = 1.25
+ZOOM_FINISH = 1.5  # punch-in on the fighters once a round has been decided
+
+
+class Camera:
+    # Scrolls the view across a stage wider than the screen, easing towards the
+    # midpoint of the living fighters, and zooms in on close exchanges and on the
+    # hit that ends a round. Positions are world units; the view offset is whole
+    # units so sprites and the background move in lockstep. Zoom is anchored at the
+    # bottom of the world so the fighters' feet stay on screen. The camera is part of
+    # the simulation; drawing takes its frame() and points the view with it.
+    def __init__(self, stage_width=STAGE_WIDTH, view_width=WORLD_WIDTH, zoom=CAMERA_ZOOM):
+        self.stage_width = stage_width
+        self.view_width = view_width
+        self.zoom_enabled = zoom
+        self.reset()
+
+    def reset(self, x=STAGE_LEFT):
+        self.zoom = 1.0
+        self.x = self.clamp(x)
+        self.target_zoom = self.zoom
+        self.target_x = self.x
+
+    @property
+    def width(self):
+        # World units across the screen at the current zoom
+        return self.view_width / self.zoom
+
+    def clamp(self, x):
+        return min(max(x, 0), max(0, self.stage_width - self.width))
+
+    def frame(self):
+        # (offset_x, offset_y, zoom) for View.look
+        return (round(self.x), WORLD_HEIGHT - WORLD_HEIGHT / self.zoom, self.zoom)
+
+    def settled(self):
+        # Nothing left to ease towards, so the frame stays the same until the fighters move
+        return self.zoom == self.target_zoom and self.x == self.target_x
+
+    def follow(self, fighters, finish=False):
+        # Once the round is decided the loser stays in frame too
+        centers = [fighter.rect.centerx for fighter in fighters if finish or fighter.health > 0]
+        if not centers or (self.stage_width <= self.view_width and not self.zoom_enabled):
+            return
+        if self.zoom_enabled:
+            if finish:
+                target_zoom = ZOOM_FINISH
+            elif max(centers) - min(centers) < CLOSE_RANGE:
+                target_zoom = ZOOM_CLOSE
+            else:
+                target_zoom = 1.0
+            self.zoom += (target_zoom - self.zoom) * ZOOM_FOLLOW
+            if abs(target_zoom - self.zoom) < 0.001:
+                # Settle exactly, zoom 1 draws the unscaled sprites
+                self.zoom = target_zoom
+            self.target_zoom = target_zoom
+        target = self.clamp((min(centers) + max(centers)) / 2 - self.width / 2)
+        self.x += (target - self.x) * CAMERA_FOLLOW
+        if abs(target - self.x) < 0.5:
+            # Settle exactly too, the offset is whole units anyway
+            self.x = target
+        # Zooming out can push the edge past the stage before the ease catches up
+        self.x = self.clamp(self.x)
+        self.target_x = target
+
+    def capture_state(self):
+        return (self.x, self.zoom)
+
+    def restore_state(self, state):
+        self.x, self.zoom = state
+        self.target_x, self.target_zoom = state
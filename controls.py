@@ -0,0 +1,201 @@
+import pygame
+from collections import deque, namedtuple
+
+# Action bits used in the input masks
+LEFT = 1 << 0
+RIGHT = 1 << 1
+JUMP = 1 << 2
+ATTACK = 1 << 3
+TELEPORT = 1 << 4
+PAUSE = 1 << 5
+RESTART = 1 << 6
+QUIT = 1 << 7
+
+KEY_BINDINGS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: JUMP,
+    pygame.K_x: ATTACK,
+    pygame.K_z: TELEPORT,
+    pygame.K_SPACE: PAUSE,
+    pygame.K_r: RESTART,
+    pygame.K_ESCAPE: QUIT,
+}
+
+# Window events that mean the screen contents were lost and must be drawn again
+EXPOSE_EVENTS = [pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED,
+                 pygame.WINDOWSIZECHANGED]
+
+# Only these events reach the queue, everything else is dropped by SDL
+ALLOWED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP] + EXPOSE_EVENTS
+
+# Commands that can be pressed a little early and still fire
+BUFFERED_ACTIONS = (JUMP, ATTACK, TELEPORT)
+BUFFER_WINDOW = 6  # ticks
+
+
+class InputSnapshot(namedtuple("InputSnapshot", "tick pressed just_pressed quit")):
+    # Immutable view of the controls for one tick
+    __slots__ = ()
+
+    def held(self, action):
+        return bool(self.pressed & action)
+
+    def pressed_now(self, action):
+        return bool(self.just_pressed & action)
+
+
+class InputBuffer:
+    # Remembers the tick each command was last pressed on
+    def __init__(self, window=BUFFER_WINDOW):
+        self.window = window
+        self.pressed_at = {}
+
+    def push(self, snapshot):
+        for action in BUFFERED_ACTIONS:
+            if snapshot.just_pressed & action:
+                self.pressed_at[action] = snapshot.tick
+
+    def peek(self, action, tick):
+        pressed_tick = self.pressed_at.get(action)
+        return pressed_tick is not None and tick - pressed_tick <= self.window
+
+    def consume(self, action, tick):
+        if self.peek(action, tick):
+            del self.pressed_at[action]
+            return True
+        return False
+
+    def clear(self):
+        self.pressed_at.clear()
+
+
+class LatencyStats:
+    # Collects press-to-screen latency samples in milliseconds
+    def __init__(self, history=240):
+        self.count = 0
+        self.total = 0
+        self.worst = 0
+        self.recent = deque(maxlen=history)
+
+    def add(self, latency_ms):
+        self.count += 1
+        self.total += latency_ms
+        self.worst = max(self.worst, latency_ms)
+        self.recent.append(latency_ms)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        if not self.count:
+            return "Input latency (poll to present): no samples"
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+        return (f"Input latency (poll to present): {self.count} samples, mean {self.mean():.1f} ms, "
+                f"p95 {p95} ms, max {self.worst} ms")
+
+
+class InputHandler:
+    def __init__(self, bindings=None):
+        self.bindings = bindings or KEY_BINDINGS
+        self.tick = 0
+        self.pressed = 0
+        self.buffer = InputBuffer()
+        self.latency = LatencyStats()
+        self.event_times = {}  # action bit -> (timestamp, tick) of the oldest unconsumed press
+        self.acted = deque()  # (timestamp, tick) of presses that drove the game, until presented
+        self.exposed = False  # the window was uncovered or restored during the last poll
+        self.snapshot = InputSnapshot(0, 0, 0, False)
+
+    def install_event_filter(self):
+        # Block everything first, then allow only what the game reads
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(ALLOWED_EVENTS)
+
+    def poll(self):
+        # Drain the event queue once and build this tick's snapshot
+        self.tick += 1
+        self.expire_event_times()
+        just_pressed = 0
+        quit_requested = False
+        self.exposed = False
+        now = pygame.time.get_ticks()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit_requested = True
+            elif event.type == pygame.KEYDOWN:
+                action = self.bindings.get(event.key)
+                if action:
+                    just_pressed |= action
+                    self.pressed |= action
+                    # pygame events carry no SDL timestamp, so presses are stamped when the
+                    # queue is drained; time spent waiting in the queue is not counted
+                    self.event_times.setdefault(action, (now, self.tick))
+            elif event.type == pygame.KEYUP:
+                action = self.bindings.get(event.key)
+                if action:
+                    self.pressed &= ~action
+            elif event.type in EXPOSE_EVENTS:
+                self.exposed = True
+
+        if just_pressed & QUIT:
+            quit_requested = True
+        return self.publish(just_pressed, quit_requested)
+
+    def feed(self, pressed, just_pressed):
+        # Replay a recorded tick instead of reading the event queue
+        self.tick += 1
+        self.expire_event_times()
+        self.pressed = pressed
+        return self.publish(just_pressed, False)
+
+    def publish(self, just_pressed, quit_requested):
+        self.snapshot = InputSnapshot(self.tick, self.pressed, just_pressed, quit_requested)
+        self.buffer.push(self.snapshot)
+        return self.snapshot
+
+    def expire_event_times(self):
+        # Presses that never drove an action must not count as latency later
+        for action, (stamp, tick) in list(self.event_times.items()):
+            window = self.buffer.window if action in BUFFERED_ACTIONS else 0
+            if self.tick - tick > window:
+                del self.event_times[action]
+
+    def acknowledge(self, action):
+        # The first time a press actually drives the game, it waits for the frame showing it
+        pending = self.event_times.pop(action, None)
+        if pending is not None:
+            self.acted.append((pending[0], self.tick))
+
+    def presented(self, tick=None):
+        # Called after a frame is on screen; `tick` is the input tick it was drawn from, when
+        # that can lag behind (a worker thread simulating ahead). Latency ends here.
+        now = pygame.time.get_ticks()
+        acted = self.acted
+        while acted and (tick is None or acted[0][1] <= tick):
+            self.latency.add(now - acted.popleft()[0])
+
+    def consume(self, action):
+        # Take a buffered command, if it was pressed recently enough
+        if self.buffer.consume(action, self.tick):
+            self.acknowledge(action)
+            return True
+        return False
+
+    def reset(self):
+        self.buffer.clear()
+        self.event_times.clear()
+
+    def capture_state(self):
+        return {"tick": self.tick, "pressed": self.pressed, "snapshot": tuple(self.snapshot),
+                "buffer": dict(self.buffer.pressed_at)}
+
+    def restore_state(self, state):
+        self.tick = state["tick"]
+        self.pressed = state["pressed"]
+        self.snapshot = InputSnapshot(*state["snapshot"])
+        self.buffer.pressed_at = dict(state["buffer"])
+        self.event_times.clear()
+        self.acted.clear()
@@ -1,7 +1,14 @@
 import pygame
 import os
 import random
-from animation import Animation
+from animation import Animation, memory_report
+from scene import FighterPose
+from settings import STAGE_WIDTH, GROUND_Y
+from hitbox import load_boxes, attack_hits
+from render_queue import FIGHTERS, INDICATORS
+from audio import sounds
+from timers import TimerWheel, Countdown, RegeneratingHealth
+from telemetry import ENEMY, HIT, DAMAGE, JUMP, AI_ACTION, AI_ACTIONS, AGGRESSION_LEVELS
 
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)
@@ -9,22 +16,40 @@ RED = (255, 0, 0)
 YELLOW = (255, 255, 0)
 
 class Enemy:
-    def __init__(self, x, y, width, height, color):
+    # Tick-based timers live on the shared wheel instead of being decremented every update
+    health = RegeneratingHealth()
+    attack_cooldown = Countdown()
+    move_timer = Countdown(allow_negative=True)
+    
+    # One subfolder per animation state
+    asset_path = "assets/enemy/"
+    
+    # Attributes captured in replay keyframes
+    state_fields = ("velocity_y", "is_jumping", "base_health", "last_hit_tick", "regen_paused", "facing_right",
+                    "attack_cooldown_deadline", "attack_landed", "attack_damage", "move_timer_deadline",
+                    "current_action", "aggression_level", "current_state")
+    
+    def __init__(self, x, y, width, height, color, effects=None, timers=None, telemetry=None, rng=None):
+        self.timers = timers if timers is not None else TimerWheel()
+        self.telemetry = telemetry  # match event recorder, optional
+        self.rng = rng if rng is not None else random  # seeded by the game for replays
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
+        self.effects = effects  # particle system, optional
         self.velocity_y = 0
         self.jump_power = -15
         self.gravity = 0.8
         self.is_jumping = False
-        self.health = 100
         self.max_health = 100
+        self.health_regen_delay = 180  
+        self.health = 100
         self.facing_right = False
         self.attack_cooldown = 0
+        self.attack_landed = False
+        self.attack_damage = 5
         self.move_timer = 0
         self.current_action = "idle"
         self.aggression_level = "normal"  
-        self.health_regen_timer = 0
-        self.health_regen_delay = 180  
         
         # Animation states
         self.current_state = "idle"
@@ -35,40 +60,62 @@ class Enemy:
         self.attack_sound = None
         self.load_sounds()
     
+    def reset(self, x, y):
+        # Back to a fresh fighter for a new round, keeping loaded animations and sounds
+        self.rect.topleft = (x, y)
+        self.velocity_y = 0
+        self.is_jumping = False
+        self.health = self.max_health
+        self.facing_right = False
+        self.attack_cooldown = 0
+        self.attack_landed = False
+        self.attack_damage = 5
+        self.move_timer = 0
+        self.current_action = "idle"
+        self.aggression_level = "normal"
+        self.current_state = "idle"
+        self.current_animation = self.states.get("idle", None)
+        if self.current_animation:
+            self.current_animation.reset()
+    
     def load_sounds(self):
         # Lod enemy sounds
         try:
-            self.attack_sound = pygame.mixer.Sound("assets/audio/attack/slash.wav")
-            self.attack_sound.set_volume(0.7)  
+            # Shared with the game, so a new enemy does not decode it again
+            self.attack_sound = sounds.load("assets/audio/attack/slash.wav", 0.7)
         except:
             print("Could not load enemy attack sound")
     
     def load_animations(self):
         # Load all animations for the enemy
-        base_path = "assets/enemy/"
+        base_path = self.asset_path
         
         # Load idle animation
         idle_frames = self.load_frames_from_folder(os.path.join(base_path, "idle"))
         if idle_frames:
-            self.states["idle"] = Animation(idle_frames, speed=10)
+            self.states["idle"] = Animation(idle_frames, speed=10, boxes=load_boxes(os.path.join(base_path, "idle")))
         
         # Load run animation
         run_frames = self.load_frames_from_folder(os.path.join(base_path, "run"))
         if run_frames:
-            self.states["run"] = Animation(run_frames, speed=5)  
+            self.states["run"] = Animation(run_frames, speed=5, boxes=load_boxes(os.path.join(base_path, "run")))  
         
         # Load jump animation
         jump_frames = self.load_frames_from_folder(os.path.join(base_path, "jump"))
         if jump_frames:
-            self.states["jump"] = Animation(jump_frames, speed=10, loop=False)
+            self.states["jump"] = Animation(jump_frames, speed=10, loop=False, boxes=load_boxes(os.path.join(base_path, "jump")))
         
         # Load attack animation
         attack_frames = self.load_frames_from_folder(os.path.join(base_path, "attack"))
         if attack_frames:
-            self.states["attack"] = Animation(attack_frames, speed=5, loop=False)
+            self.states["attack"] = Animation(attack_frames, speed=5, loop=False, boxes=load_boxes(os.path.join(base_path, "attack")))
         
         # Set default state
         self.current_animation = self.states.get("idle", None)
+        for state, animation in self.states.items():
+            animation.track(os.path.join(base_path, state))
+        if self.states:
+            print(memory_report(base_path, self.states))
     
     def load_frames_from_folder(self, folder_path):
         # Load all PNG images from a folder and return as list of surfaces
@@ -104,8 +151,8 @@ class Enemy:
         # Boundary checking
         if self.rect.left < 0:
             self.rect.left = 0
-        if self.rect.right > 1280:  # SCREEN_WIDTH
-            self.rect.right = 1280
+        if self.rect.right > STAGE_WIDTH:
+            self.rect.right = STAGE_WIDTH
             
         # Collision with player
         if self.rect.colliderect(player.rect):
@@ -125,23 +172,20 @@ class Enemy:
             self.velocity_y = self.jump_power
             self.is_jumping = True
             self.set_state("jump")
+            if self.telemetry:
+                self.telemetry.record(JUMP, ENEMY, self.rect.centerx)
     
     def attack(self, player):
         if self.attack_cooldown <= 0 and "attack" in self.states:
+            if self.current_state == "attack":
+                # A follow-up before the last swing finished starts over on its active frame
+                self.current_animation.reset()
             self.set_state("attack")
+            self.attack_landed = False
+            self.attack_damage = 8 if self.aggression_level == "aggressive" else 5
             
-            attack_range = 50  
-            attack_height = 40  
-            
-            if self.facing_right:
-                attack_rect = pygame.Rect(self.rect.right, self.rect.centery - attack_height//2, attack_range, attack_height)
-            else:
-                attack_rect = pygame.Rect(self.rect.left - attack_range, self.rect.centery - attack_height//2, attack_range, attack_height)
-            
-            # Check if attack hits player
-            if attack_rect.colliderect(player.rect):
-                damage = 8 if self.aggression_level == "aggressive" else 5
-                player.health -= damage
+            # The first frame may already connect
+            self.resolve_attack(player)
             
             # Play enemy attack sound
             if self.attack_sound:
@@ -149,21 +193,52 @@ class Enemy:
             
             # Reduced cooldown for faster attacks
             self.attack_cooldown = 15 if self.aggression_level == "aggressive" else 25
-            self.health_regen_timer = 0
+            # Attacking restarts the enemy's own regen delay
+            self.health = self.health
+    
+    def resolve_attack(self, player):
+        # Each attack lands at most once, on the first active frame that touches the player
+        if self.attack_landed or self.current_state != "attack":
+            return
+        
+        contact = attack_hits(self, player)
+        if contact:
+            self.attack_landed = True
+            if self.effects:
+                self.effects.hit_sparks(contact.centerx, contact.centery, self.facing_right)
+            if self.telemetry:
+                self.telemetry.record(HIT, ENEMY, self.attack_damage, contact.centerx, contact.centery)
+            player.take_damage(self.attack_damage)
+    
+    def capture_state(self):
+        # Plain values only, so keyframes can be pickled; deadlines are absolute ticks
+        state = {name: getattr(self, name) for name in self.state_fields}
+        state["rect"] = tuple(self.rect)
+        state["animation"] = self.current_animation.capture_state() if self.current_animation else None
+        return state
+    
+    def restore_state(self, state):
+        for name in self.state_fields:
+            setattr(self, name, state[name])
+        self.rect = pygame.Rect(state["rect"])
+        self.current_animation = self.states.get(self.current_state)
+        if self.current_animation and state["animation"]:
+            self.current_animation.restore_state(state["animation"])
+    
+    def is_regenerating(self):
+        return (0 < self.health < self.max_health and not self.regen_paused and
+                self.timers.now - self.last_hit_tick >= self.health_regen_delay)
+    
+    def pause_regen(self):
+        # Bank what has regenerated so far and hold it until health is next written
+        self.health = self.health
+        self.regen_paused = True
     
     def take_damage(self, amount):
+        # Writing health also restarts the regen delay
         self.health -= amount
-        self.health_regen_timer = 0  # Reset regen timer when taking damage
-    
-    def regenerate_health(self):
-        # Only regenerate if not at full health and not recently damaged
-        if self.health < self.max_health and self.health_regen_timer >= self.health_regen_delay:
-            # Regenerate health every 10 frames (6 HP per second)
-            if self.health_regen_timer % 10 == 0:
-                self.health = min(self.max_health, self.health + 1)
-        
-        if self.health < self.max_health:
-            self.health_regen_timer += 1
+        if self.telemetry:
+            self.telemetry.record(DAMAGE, ENEMY, amount, self.health)
     
     def update_aggression_level(self):
         # Change behavior based on health
@@ -175,17 +250,11 @@ class Enemy:
             self.aggression_level = "aggressive"  
     
     def ai_think(self, player):
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-        
-        self.move_timer -= 1
+        # Decisions only; the AI scheduler decides how often this runs
         
         # Update aggression based on health
         self.update_aggression_level()
         
-        # Health regeneration
-        self.regenerate_health()
-        
         # Calculate distance to player
         distance_x = player.rect.centerx - self.rect.centerx
         distance_y = abs(player.rect.centery - self.rect.centery)
@@ -199,22 +268,50 @@ class Enemy:
                 # Very aggressive - mostly attack and chase
                 actions = ["move_towards", "attack", "attack", "jump", "move_towards"]
                 weights = [30, 40, 40, 10, 30]
-                self.move_timer = random.randint(20, 60)  # Faster decisions
+                self.move_timer = self.rng.randint(20, 60)  # Faster decisions
                 
             elif self.aggression_level == "defensive":
                 # Defensive - hit and run tactics
                 actions = ["move_away", "attack", "move_towards", "jump", "move_away"]
                 weights = [40, 25, 15, 10, 40]
-                self.move_timer = random.randint(40, 80)  # Slower, more cautious decisions
+                self.move_timer = self.rng.randint(40, 80)  # Slower, more cautious decisions
                 
             else:  # normal
                 actions = ["move_towards", "move_away", "jump", "attack", "idle"]
                 weights = [40, 10, 15, 30, 5]
-                self.move_timer = random.randint(30, 90)
+                self.move_timer = self.rng.randint(30, 90)
             
-            self.current_action = random.choices(actions, weights=weights)[0]
+            self.current_action = self.rng.choices(actions, weights=weights)[0]
+            if self.telemetry:
+                self.telemetry.record(AI_ACTION, ENEMY, AI_ACTIONS.index(self.current_action),
+                                      AGGRESSION_LEVELS.index(self.aggression_level), distance_x)
         
-        # Execute current action with aggression-based parameters
+        if self.current_action == "jump" and not self.is_jumping:
+            # More likely to jump when aggressive to close distance
+            if self.aggression_level == "aggressive" or (self.aggression_level == "defensive" and self.rng.random() < 0.3):
+                self.jump()
+        
+        elif self.current_action == "attack":
+        # Reduced attack ranges based on aggression
+            if self.aggression_level == "aggressive":
+                attack_range = 120  
+            elif self.aggression_level == "defensive":
+                attack_range = 80   
+            else:
+                attack_range = 100  
+            
+            # Make enemy more likely to attack when close
+            if abs(distance_x) < attack_range and distance_y < 40:  # Reduced vertical tolerance
+                self.attack(player)
+                
+                # After attacking when defensive, immediately consider moving away
+                if self.aggression_level == "defensive" and self.rng.random() < 0.7:
+                    self.current_action = "move_away"
+                    self.move_timer = 20  
+    
+    def perform_action(self, player):
+        # Carry out the current movement every tick with aggression-based parameters
+        distance_x = player.rect.centerx - self.rect.centerx
         move_speed = 4 if self.aggression_level == "aggressive" else 3
         
         if self.current_action == "move_towards":
@@ -248,29 +345,6 @@ class Enemy:
                         self.move(-move_speed, player)
                     else:
                         self.move(move_speed, player)
-        
-        elif self.current_action == "jump" and not self.is_jumping:
-            # More likely to jump when aggressive to close distance
-            if self.aggression_level == "aggressive" or (self.aggression_level == "defensive" and random.random() < 0.3):
-                self.jump()
-        
-        elif self.current_action == "attack":
-        # Reduced attack ranges based on aggression
-            if self.aggression_level == "aggressive":
-                attack_range = 120  
-            elif self.aggression_level == "defensive":
-                attack_range = 80   
-            else:
-                attack_range = 100  
-            
-            # Make enemy more likely to attack when close
-            if abs(distance_x) < attack_range and distance_y < 40:  # Reduced vertical tolerance
-                self.attack(player)
-                
-                # After attacking when defensive, immediately consider moving away
-                if self.aggression_level == "defensive" and random.random() < 0.7:
-                    self.current_action = "move_away"
-                    self.move_timer = 20  
     
     def update(self, player):
         # Apply gravity
@@ -278,8 +352,10 @@ class Enemy:
         self.rect.y += self.velocity_y
         
         # Ground collision
-        if self.rect.bottom >= 720 - 20:  # SCREEN_HEIGHT - ground height
-            self.rect.bottom = 720 - 20
+        if self.rect.bottom >= GROUND_Y:
+            self.rect.bottom = GROUND_Y
+            if self.is_jumping and self.effects:
+                self.effects.dust(self.rect.centerx, self.rect.bottom)
             self.is_jumping = False
             self.velocity_y = 0
         
@@ -295,6 +371,9 @@ class Enemy:
         if self.current_animation:
             self.current_animation.update()
             
+            # Active attack frames are checked every tick against the player
+            self.resolve_attack(player)
+            
             # Return to appropriate state after attack animation finishes
             if self.current_state == "attack" and self.current_animation.is_finished():
                 if self.is_jumping:
@@ -311,44 +390,47 @@ class Enemy:
                 else:
                     self.set_state("idle")
         
-        # AI behavior
-        self.ai_think(player)
+        # The chosen movement runs every tick; thinking is scheduled by the game
+        # and cooldowns, decision timing and regen are read off the timer wheel
+        self.perform_action(player)
     
-    def draw(self, screen):
-        if self.current_animation and self.current_animation.get_current_frame():
-            current_frame = self.current_animation.get_current_frame()
-            
-            # Flip the frame if facing left (enemies face opposite direction)
-            if not self.facing_right:
-                current_frame = pygame.transform.flip(current_frame, True, False)
-            
-            # Draw the sprite centered on the rectangle
-            sprite_rect = current_frame.get_rect()
-            sprite_rect.center = self.rect.center
-            screen.blit(current_frame, sprite_rect)
+    def pose(self):
+        # What drawing needs from this tick, see scene.FighterPose
+        animation = self.current_animation
+        return FighterPose(self, animation, animation.current_frame if animation else 0, self.rect.copy(),
+                           self.facing_right, self.health, self.max_health, False, 0, None,
+                           self.is_regenerating(), self.aggression_level, self.timers.now)
+    
+    def draw(self, queue, view, pose):
+        # Submits cached sprites to the render queue, positioned in world units through the view.
+        # Everything that moves comes from the pose, so this can run while the next tick simulates.
+        # Health and regen indicators are HUD widgets bound to this fighter.
+        sprites = queue.sprites
+        rect = pose.rect
+        z = rect.bottom
+        
+        animation = pose.animation
+        if animation and animation.get_frame(pose.frame):
+            center = view.point(*rect.center)
+            # One sprite per cached zoom level in use, two while blending between levels
+            for current_frame, scale, alpha in view.sprite_levels(animation.get_frame(pose.frame)):
+                # Flip the frame if facing left (enemies face opposite direction)
+                if not pose.facing_right:
+                    current_frame = sprites.flipped(current_frame)
+                
+                # Trimmed frame placed where the centred full frame would be
+                sprite_rect = current_frame.get_rect(topleft=animation.sprite_position(
+                    pose.frame, pose.facing_right, center, scale))
+                if alpha is not None:
+                    current_frame = sprites.with_alpha(current_frame, alpha)
+                queue.submit(FIGHTERS, z, current_frame, sprite_rect)
         else:
             # Fallback: draw rectangle if no sprites loaded
-            pygame.draw.rect(screen, self.color, self.rect)
+            body_rect = view.rect(rect)
+            queue.submit(FIGHTERS, z, sprites.rect(body_rect.size, self.color), body_rect)
         
         # Draw facing direction indicator with color based on aggression
-        direction_color = RED if self.aggression_level == "aggressive" else YELLOW if self.aggression_level == "defensive" else GREEN
-        direction_x = self.rect.centerx + (20 if self.facing_right else -20)
-        pygame.draw.circle(screen, direction_color, (direction_x, self.rect.centery), 5)
-        
-        # Draw health bar
-        health_width = (self.rect.width * self.health) // 100
-        health_color = GREEN if self.health > 50 else RED
-        health_bar = pygame.Rect(self.rect.x, self.rect.y - 25, health_width, 10)
-        pygame.draw.rect(screen, health_color, health_bar)
-        
-        # Draw health bar background
-        health_bg = pygame.Rect(self.rect.x, self.rect.y - 25, self.rect.width, 10)
-        pygame.draw.rect(screen, WHITE, health_bg, 1)
-        
-        # Draw regen indicator (pulsing green circle when regenerating)
-        if self.health_regen_timer >= self.health_regen_delay and self.health < self.max_health:
-            regen_x = self.rect.centerx
-            regen_y = self.rect.y - 40
-            pulse = (pygame.time.get_ticks() // 200) % 2  # Pulsing effect
-            size = 5 if pulse else 3
-            pygame.draw.circle(screen, GREEN, (regen_x, regen_y), size)
+        direction_color = RED if pose.aggression_level == "aggressive" else YELLOW if pose.aggression_level == "defensive" else GREEN
+        direction_x = rect.centerx + (20 if pose.facing_right else -20)
+        dot = sprites.circle(view.length(5), direction_color)
+        queue.submit(INDICATORS, z, dot, dot.get_rect(center=view.point(direction_x, rect.centery)))
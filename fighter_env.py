@@ -0,0 +1,268 @@
+import os
+import time
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+# The environment never opens a real window or audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from controls import LEFT, RIGHT, JUMP, ATTACK, TELEPORT
+from settings import STAGE_WIDTH, WORLD_HEIGHT
+from pixel_obs import PixelObserver
+
+# Actions are masks of these controls, so there are 32 of them
+ACTION_BITS = (LEFT, RIGHT, JUMP, ATTACK, TELEPORT)
+ACTION_COUNT = 1 << len(ACTION_BITS)
+
+# Per fighter: x, y, vx, vy, health, attack cooldown, teleport cooldown, facing, airborne
+FIGHTER_FEATURES = 9
+OBSERVATION_SIZE = 2 * FIGHTER_FEATURES
+
+COOLDOWN_SCALE = 30  # ticks that map to 1.0 in the observation
+MAX_EPISODE_TICKS = 60 * 60  # a round that goes on for a minute is cut off
+ENV_RENDER_SIZE = (128, 72)  # smallest surface the assets still load onto
+WIN_REWARD = 1.0
+
+
+def action_mask(action):
+    # Action index to a controls mask, bit n of the index is ACTION_BITS[n]
+    mask = 0
+    for n, bit in enumerate(ACTION_BITS):
+        if action >> n & 1:
+            mask |= bit
+    return mask
+
+
+ACTION_MASKS = [action_mask(action) for action in range(ACTION_COUNT)]
+
+
+class FighterEnv:
+    # One round against the scripted Enemy as a reset()/step() environment.
+    # Runs Game.update without drawing unless pixel observations are asked for, in which
+    # case observations are (height, width, 3) views of the rendered frame (or a tuple of
+    # the last `frame_stack` frames). An episode ends when the round is decided.
+    def __init__(self, seed=None, frame_skip=1, max_ticks=MAX_EPISODE_TICKS, effects=False,
+                 pixel_size=None, frame_stack=1):
+        from main import Game
+        render_size = tuple(pixel_size) if pixel_size else ENV_RENDER_SIZE
+        self.game = Game(render_size=render_size, window_size=render_size, seed=seed)
+        self.pixels = PixelObserver(self.game, stack=frame_stack) if pixel_size else None
+        # Particles are visual only; leaving them off saves time per step
+        self.game.particles.enabled = effects and self.game.particles.enabled
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.start_state = self.game.capture_state()
+        # Episode seeds; the start state would otherwise hand every episode the same random stream
+        self.seeds = np.random.default_rng(seed)
+        self.observation = np.zeros(OBSERVATION_SIZE, np.float32)
+        self.last_x = [0, 0]
+        self.ticks = 0
+        self.last_pressed = 0
+
+    def reset(self, seed=None):
+        # Restores the start of the round instead of rebuilding fighters and reloading assets
+        game = self.game
+        game.restore_state(self.start_state)
+        if seed is not None:
+            self.seeds = np.random.default_rng(seed)
+        episode_seed = int(self.seeds.integers(1 << 32))
+        game.rng.seed(episode_seed)
+        game.particles.rng = np.random.default_rng(episode_seed)
+        self.ticks = 0
+        self.last_pressed = 0
+        self.last_x = [game.player.rect.centerx, game.enemies[0].rect.centerx]
+        if self.pixels:
+            self.pixels.reset()
+        return self.observe()
+
+    def step(self, action):
+        game = self.game
+        player = game.player
+        enemy = game.enemies[0]
+        pressed = ACTION_MASKS[action]
+        player_health = player.health
+        enemy_health = enemy.health
+
+        for _ in range(self.frame_skip):
+            # Presses are edges, like a keyboard: holding ATTACK does not repeat it
+            just_pressed = pressed & ~self.last_pressed
+            self.last_pressed = pressed
+            game.input.feed(pressed, just_pressed)
+            game.update()
+            self.ticks += 1
+            if game.round_over:
+                break
+
+        # Damage dealt minus damage taken, regen does not count
+        reward = (max(0, enemy_health - enemy.health) - max(0, player_health - player.health)) / 100
+        done = game.round_over or self.ticks >= self.max_ticks
+        if game.round_over:
+            reward += WIN_REWARD if player.health > 0 else -WIN_REWARD
+        return self.observe(), reward, done, {"ticks": self.ticks}
+
+    def observe(self):
+        if self.pixels:
+            self.pixels.render()
+            return self.pixels.observation()
+        obs = self.observation
+        game = self.game
+        for index, fighter in enumerate((game.player, game.enemies[0])):
+            base = index * FIGHTER_FEATURES
+            rect = fighter.rect
+            obs[base:base + FIGHTER_FEATURES] = (
+                rect.centerx / STAGE_WIDTH,
+                rect.bottom / WORLD_HEIGHT,
+                (rect.centerx - self.last_x[index]) / 10,
+                fighter.velocity_y / 20,
+                fighter.health / fighter.max_health,
+                fighter.attack_cooldown / COOLDOWN_SCALE,
+                getattr(fighter, "teleport_cooldown", 0) / COOLDOWN_SCALE,
+                1.0 if fighter.facing_right else -1.0,
+                1.0 if fighter.is_jumping else 0.0,
+            )
+            self.last_x[index] = rect.centerx
+        return obs.copy()
+
+    def close(self):
+        import pygame
+        pygame.quit()
+
+
+def check_vector_kwargs(env_kwargs):
+    # The vector envs batch feature vectors into fixed (count, OBSERVATION_SIZE) arrays
+    if env_kwargs.get("pixel_size") is not None or env_kwargs.get("frame_stack", 1) != 1:
+        raise ValueError("Pixel observations are not supported by the vector envs, use FighterEnv directly")
+
+
+class SyncVectorEnv:
+    # N environments stepped in lockstep in this process, auto-resetting when one finishes
+    def __init__(self, count, seed=0, **env_kwargs):
+        check_vector_kwargs(env_kwargs)
+        self.envs = [FighterEnv(seed=seed + index, **env_kwargs) for index in range(count)]
+        self.count = count
+        self.observations = np.zeros((count, OBSERVATION_SIZE), np.float32)
+        self.rewards = np.zeros(count, np.float32)
+        self.dones = np.zeros(count, np.bool_)
+
+    def reset(self):
+        for index, env in enumerate(self.envs):
+            self.observations[index] = env.reset()
+        return self.observations.copy()
+
+    def step(self, actions):
+        step_envs(self.envs, actions, self.observations, self.rewards, self.dones)
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy()
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+
+def step_envs(envs, actions, observations, rewards, dones):
+    for index, env in enumerate(envs):
+        obs, reward, done, _ = env.step(int(actions[index]))
+        if done:
+            obs = env.reset()
+        observations[index] = obs
+        rewards[index] = reward
+        dones[index] = done
+
+
+def shared_arrays(buffers, count):
+    # Views over the shared blocks, laid out the same in every process
+    return (np.ndarray((count, OBSERVATION_SIZE), np.float32, buffers[0].buf),
+            np.ndarray(count, np.int32, buffers[1].buf),
+            np.ndarray(count, np.float32, buffers[2].buf),
+            np.ndarray(count, np.bool_, buffers[3].buf))
+
+
+def worker(connection, names, count, start, stop, seed, env_kwargs):
+    # Hosts envs [start, stop) and works straight in the shared arrays; the pipe only signals
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    observations, actions, rewards, dones = shared_arrays(buffers, count)
+    envs = [FighterEnv(seed=seed + index, **env_kwargs) for index in range(start, stop)]
+    local = slice(start, stop)
+    try:
+        while True:
+            command = connection.recv()
+            if command == "step":
+                step_envs(envs, actions[local], observations[local], rewards[local], dones[local])
+            elif command == "reset":
+                for index, env in enumerate(envs):
+                    observations[start + index] = env.reset()
+            elif command == "close":
+                break
+            connection.send(True)
+    finally:
+        del observations, actions, rewards, dones
+        for buffer in buffers:
+            buffer.close()
+
+
+class SubprocVectorEnv:
+    # N environments split over worker processes; observations, actions, rewards and
+    # done flags live in shared memory, so a step only sends one message per worker
+    def __init__(self, count, workers=None, seed=0, **env_kwargs):
+        check_vector_kwargs(env_kwargs)
+        workers = min(count, workers or os.cpu_count())
+        self.count = count
+        sizes = (count * OBSERVATION_SIZE * 4, count * 4, count * 4, count)
+        self.buffers = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        self.observations, self.actions, self.rewards, self.dones = shared_arrays(self.buffers, count)
+
+        context = get_context("spawn")
+        self.connections = []
+        self.processes = []
+        names = [buffer.name for buffer in self.buffers]
+        bounds = np.linspace(0, count, workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = context.Pipe()
+            process = context.Process(target=worker, daemon=True,
+                                      args=(child, names, count, int(start), int(stop), seed, env_kwargs))
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def call(self, command):
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self):
+        self.call("reset")
+        return self.observations.copy()
+
+    def step(self, actions):
+        self.actions[:] = actions
+        self.call("step")
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy()
+
+    def close(self):
+        for connection in self.connections:
+            connection.send("close")
+        for process in self.processes:
+            process.join()
+        del self.observations, self.actions, self.rewards, self.dones
+        for buffer in self.buffers:
+            buffer.close()
+            buffer.unlink()
+
+
+def benchmark(count=64, steps=500, workers=None):
+    # Random-action throughput of the subprocess vector env
+    env = SubprocVectorEnv(count, workers)
+    env.reset()
+    rng = np.random.default_rng(0)
+    started = time.perf_counter()
+    for _ in range(steps):
+        env.step(rng.integers(0, ACTION_COUNT, count))
+    elapsed = time.perf_counter() - started
+    env.close()
+    print(f"{count} envs on {len(env.processes)} workers: {count * steps / elapsed:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    benchmark()
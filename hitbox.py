@@ -0,0 +1,134 @@
+import json
+import os
+import pygame
+
+# Fallback hitbox used when an attack animation has no authored boxes
+ATTACK_RANGE = 50
+ATTACK_HEIGHT = 40
+
+BOXES_FILE = "boxes.json"
+
+# Hitboxes are solid rects, so one filled mask per size is shared by every frame
+_filled_masks = {}
+
+
+def load_boxes(folder_path):
+    # Read per-frame box data authored next to the frames:
+    # {"0": {"hurtbox": [x, y, w, h], "hitbox": [x, y, w, h]}, ...}
+    path = os.path.join(folder_path, BOXES_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return {int(index): boxes for index, boxes in data.items()}
+    except (OSError, ValueError) as e:
+        print(f"Unable to load box data: {path}")
+        print(e)
+        return {}
+
+
+def filled_mask(size):
+    mask = _filled_masks.get(size)
+    if mask is None:
+        mask = pygame.mask.Mask(size, fill=True)
+        _filled_masks[size] = mask
+    return mask
+
+
+def legacy_hitbox(rect, facing_right):
+    # Fixed box in front of the body, as attacks worked before per-frame data
+    if facing_right:
+        return pygame.Rect(rect.right, rect.centery - ATTACK_HEIGHT // 2, ATTACK_RANGE, ATTACK_HEIGHT)
+    return pygame.Rect(rect.left - ATTACK_RANGE, rect.centery - ATTACK_HEIGHT // 2, ATTACK_RANGE, ATTACK_HEIGHT)
+
+
+def hitbox_for(fighter):
+    # World-space hitbox of the current attack frame, or None when nothing is active
+    animation = fighter.current_animation
+    if fighter.current_state != "attack" or animation is None or not animation.frames:
+        return None
+
+    index = animation.current_frame
+    if animation.has_hitboxes:
+        box = animation.hitboxes[fighter.facing_right][index]
+        if box is None:
+            return None
+        return box.move(animation.frame_rect(index, fighter.rect.center).topleft)
+
+    # Without authored data the first attack frame is the active one
+    if index != 0:
+        return None
+    return legacy_hitbox(fighter.rect, fighter.facing_right)
+
+
+def hurtbox_for(fighter):
+    # World-space hurtbox, plus the frame mask and where that mask starts
+    animation = fighter.current_animation
+    if animation is None or not animation.frames:
+        return fighter.rect, None, None
+
+    index = animation.current_frame
+    facing = fighter.facing_right
+    frame_rect = animation.frame_rect(index, fighter.rect.center)
+    hurtbox = animation.hurtboxes[facing][index].move(frame_rect.topleft)
+    # Masks only cover the trimmed frame
+    origin = animation.sprite_position(index, facing, fighter.rect.center)
+    return hurtbox, animation.masks[facing][index], origin
+
+
+def attack_hits(attacker, target):
+    # Contact area of the hit, or None on a miss.
+    # Cheap rect test first, then a mask overlap only when the rects touch.
+    hitbox = hitbox_for(attacker)
+    if hitbox is None:
+        return None
+
+    hurtbox, mask, origin = hurtbox_for(target)
+    if not hitbox.colliderect(hurtbox):
+        return None
+
+    # Only sprite pixels inside both boxes count
+    area = hitbox.clip(hurtbox)
+    if mask is None:
+        return area
+    offset = (area.x - origin[0], area.y - origin[1])
+    if mask.overlap(filled_mask(area.size), offset) is None:
+        return None
+    return area
+
+
+def combo_check(attacks=14):
+    # Every attack pressed as soon as the cooldown allows, on a target standing in reach,
+    # must connect, including follow-ups started while the last swing is still animating.
+    # Run against the dummy display.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game
+    from settings import GROUND_Y
+
+    game = Game(seed=1)
+    for attacker, target in ((game.player, game.enemies[0]), (game.enemies[0], game.player)):
+        attacker.rect.bottom = target.rect.bottom = GROUND_Y
+        target.rect.left = attacker.rect.right
+        attacker.facing_right = True
+        landed = []
+        ticks = 0
+        while len(landed) < attacks:
+            if attacker.attack_cooldown <= 0:
+                target.health = target.max_health
+                attacker.attack(target)
+                landed.append(attacker.attack_landed)
+            game.timers.advance()
+            # Standing still, so only the swing itself moves
+            attacker.current_action = "idle"
+            attacker.update(target)
+            landed[-1] = landed[-1] or attacker.attack_landed
+            ticks += 1
+        name = type(attacker).__name__
+        assert all(landed), f"{name}: {landed.count(False)} of {attacks} back-to-back attacks missed"
+        print(f"{name}: {attacks} back-to-back attacks in {ticks} ticks, all landed")
+
+
+if __name__ == "__main__":
+    combo_check()
@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+import time
+import pygame
+from hitbox import BOXES_FILE, load_boxes
+from animation import trim_frame
+from asset_memory import memory
+
+POLL_INTERVAL = 0.5  # seconds between modification-time scans
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+class FolderChange:
+    # Everything that changed in one folder during one poll. Names are the sorted image
+    # files before and after; `decoded` holds the freshly loaded (not yet converted) images.
+    def __init__(self, folder, old_names, new_names, decoded, boxes_changed):
+        self.folder = folder
+        self.old_names = old_names
+        self.new_names = new_names
+        self.decoded = decoded
+        self.boxes_changed = boxes_changed
+        self.prepared = {}  # converted once, shared by every fighter using the folder
+
+    def prepare(self, name, convert):
+        surface = self.prepared.get(name)
+        if surface is None:
+            surface = self.prepared[name] = convert(self.decoded[name])
+        return surface
+
+
+class AssetWatcher:
+    # Development mode: a background thread polls asset folders by modification time and
+    # decodes only files that changed. The game applies the results between frames.
+    def __init__(self, roots, interval=POLL_INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self.changes = queue.Queue()
+        self.snapshots = {}  # folder -> {file name: (mtime_ns, size)}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.poll_loop, name="asset-watcher", daemon=True)
+        for folder in self.folders():
+            self.snapshots[folder] = self.scan(folder)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def folders(self):
+        # Each root, plus one level of subfolders (one per animation state)
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            yield root
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        yield entry.path
+
+    def scan(self, folder):
+        # One directory listing per folder; scandir hands back the stat results with it
+        files = {}
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if entry.is_file() and (name.lower().endswith(IMAGE_EXTENSIONS) or name == BOXES_FILE):
+                        stat = entry.stat()
+                        files[name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return files
+
+    def poll_loop(self):
+        while not self.stop_event.wait(self.interval):
+            for folder in list(self.folders()):
+                self.poll(folder)
+
+    def poll(self, folder):
+        old = self.snapshots.get(folder, {})
+        new = self.scan(folder)
+        if new == old:
+            return
+
+        decoded = {}
+        for name, stamp in new.items():
+            if name == BOXES_FILE or old.get(name) == stamp:
+                continue
+            try:
+                # Decoding happens here, off the game thread
+                decoded[name] = pygame.image.load(os.path.join(folder, name))
+            except (pygame.error, OSError):
+                # Probably still being written, pick it up on the next poll
+                new[name] = old.get(name)
+                if new[name] is None:
+                    del new[name]
+        self.snapshots[folder] = new
+        self.changes.put(FolderChange(folder, image_names(old), image_names(new), decoded,
+                                      old.get(BOXES_FILE) != new.get(BOXES_FILE)))
+
+    def apply(self, game):
+        # Called on the game thread between frames; swaps in everything that is ready
+        while True:
+            try:
+                change = self.changes.get_nowait()
+            except queue.Empty:
+                return
+            started = time.perf_counter()
+            if change.folder == game.background.folder:
+                reload_backgrounds(game.background, change)
+            elif os.path.normpath(change.folder) == os.path.normpath(game.background.parallax_folder):
+                reload_parallax(game.background, change)
+            else:
+                for fighter in [game.player] + game.enemies:
+                    reload_animation(fighter, change, game.view)
+            print(f"Reloaded {change.folder}: {len(change.decoded)} files in "
+                  f"{(time.perf_counter() - started) * 1000:.1f} ms")
+            game.last_scene = None
+
+
+def image_names(files):
+    return sorted(name for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def merge_frames(old_frames, change, prepare):
+    # New frame list in file order: changed files use the decoded image, the rest keep their entry
+    old_index = {name: index for index, name in enumerate(change.old_names)}
+    frames = []
+    for name in change.new_names:
+        if name in change.decoded:
+            frames.append(change.prepare(name, prepare))
+        elif name in old_index and old_index[name] < len(old_frames):
+            frames.append(old_frames[old_index[name]])
+    return frames
+
+
+def reload_animation(fighter, change, view):
+    base = os.path.normpath(fighter.asset_path)
+    if os.path.dirname(os.path.normpath(change.folder)) != base:
+        return
+    state = os.path.basename(change.folder)
+    animation = fighter.states.get(state)
+    if animation is None:
+        print(f"New animation state {state} needs a restart")
+        return
+
+    old_frames = animation.frames
+    trimmed = merge_frames(animation.trimmed(), change, lambda image: trim_frame(image.convert_alpha()))
+    if not trimmed:
+        return
+    # Swap the whole state at once; collision data follows the new frames
+    if change.boxes_changed:
+        animation.boxes = load_boxes(change.folder)
+    animation.set_frames(trimmed)
+    animation.current_frame = min(animation.current_frame, len(trimmed) - 1)
+    for surface in old_frames:
+        if surface not in animation.frames:
+            view.forget_sprite(surface)
+
+
+def reload_backgrounds(background, change):
+    # Images unloaded to save memory stay unloaded until they are shown
+    images = merge_frames(background.images, change,
+                          lambda image: memory.track(background.prepare(image), change.folder, "background"))
+    if images:
+        background.forget(background.images)
+        background.images = images
+        background.files = [os.path.join(change.folder, name) for name in change.new_names][:len(images)]
+        background.current_bg_index = min(background.current_bg_index, len(images) - 1)
+
+
+def reload_parallax(background, change):
+    # Layers can also be added or removed; their scroll speeds follow the new count
+    background.forget(background.layers)
+    background.layers = merge_frames(background.layers, change,
+                                     lambda image: memory.track(background.prepare_layer(image), change.folder, "parallax"))
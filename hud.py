@@ -0,0 +1,172 @@
+import pygame
+from render_queue import HUD, INDICATORS
+from asset_memory import memory
+
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+_UNSET = object()
+
+
+class Widget:
+    # Holds a cached surface that is re-rasterised only when its bound value changes.
+    # Values are read from a render snapshot: the scene for screen widgets, the
+    # fighter's pose for attached ones.
+    def __init__(self, value_fn, render_fn):
+        self.value_fn = value_fn
+        self.render_fn = render_fn
+        self.value = _UNSET
+        self.surface = None
+
+    def refresh(self, source):
+        value = self.value_fn(source)
+        if value == self.value:
+            return False
+        self.value = value
+        # A value of None hides the widget
+        self.surface = None if value is None else memory.track(self.render_fn(value), "hud", "hud")
+        return True
+
+    def invalidate(self):
+        self.value = _UNSET
+
+
+class ScreenWidget(Widget):
+    # Widget pinned to a spot on the screen, e.g. the score label
+    def __init__(self, value_fn, render_fn, anchor, pos):
+        super().__init__(value_fn, render_fn)
+        self.anchor = anchor
+        self.pos = pos
+        self.rect = None
+
+    def refresh(self, source):
+        changed = super().refresh(source)
+        if changed and self.surface:
+            self.rect = self.surface.get_rect(**{self.anchor: self.pos})
+        return changed
+
+
+class AttachedWidget(Widget):
+    # Widget that follows a fighter, e.g. the health bar; only its position changes per frame
+    def __init__(self, value_fn, render_fn, fighter, offset_fn, anchor="center"):
+        super().__init__(value_fn, render_fn)
+        self.fighter = fighter
+        self.offset_fn = offset_fn
+        self.anchor = anchor
+
+
+class HUDLayer:
+    def __init__(self, view):
+        self.view = view
+        self.screen_widgets = []
+        self.attached_widgets = []
+        self.poses = {}  # fighter -> pose of the scene being drawn
+        self.rebuilds = 0
+
+    def add_text(self, font, color, fmt, value_fn, anchor, layout_pos):
+        # Text label laid out on the 1280x720 HUD grid
+        render = lambda value: font.render(fmt.format(*value), True, color)
+        widget = ScreenWidget(value_fn, render, anchor, self.view.screen_point(*layout_pos))
+        self.screen_widgets.append(widget)
+        return widget
+
+    def attach(self, widget):
+        self.attached_widgets.append(widget)
+        return widget
+
+    def detach_all(self):
+        self.attached_widgets = []
+
+    def attach_health_bar(self, fighter):
+        # Fill and outline rasterised together whenever health changes
+        view = self.view
+
+        def render(health):
+            bar = pygame.Rect(0, 0, view.length(fighter.rect.width), view.length(10))
+            surface = pygame.Surface(bar.size, pygame.SRCALPHA)
+            fill_width = round((fighter.rect.width * health // 100) * view.scale) if health > 0 else 0
+            if fill_width:
+                surface.fill(GREEN if health > 50 else RED, (0, 0, fill_width, bar.height))
+            pygame.draw.rect(surface, WHITE, surface.get_rect(), view.length(1))
+            return surface
+
+        offset = lambda pose: (pose.rect.x, pose.rect.y - 25)
+        return self.attach(AttachedWidget(lambda pose: pose.health, render, fighter, offset, "topleft"))
+
+    def attach_regen_indicator(self, fighter, is_visible):
+        # `is_visible(pose)` decides whether the dot shows at all
+        # Pulsing dot, rebuilt only when the pulse flips or regen starts/stops
+        view = self.view
+
+        def render(value):
+            size = 5 if value else 3
+            radius = view.length(size)
+            surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+            pygame.draw.circle(surface, GREEN, (radius, radius), radius)
+            return surface
+
+        def value(pose):
+            if not is_visible(pose):
+                return None
+            return (pose.tick // 12) % 2  # Pulsing effect, 200 ms at 60 ticks per second
+
+        offset = lambda pose: (pose.rect.centerx, pose.rect.y - 40)
+        return self.attach(AttachedWidget(value, render, fighter, offset))
+
+    def attach_cooldown_ring(self, fighter, progress_fn, steps=16):
+        # Teleport cooldown progress, quantised so it rebuilds at most `steps` times per cooldown
+        view = self.view
+
+        def render(step):
+            radius = view.length(8)
+            size = radius * 2 + 1
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(surface, BLUE, (radius, radius), radius)
+            pygame.draw.circle(surface, WHITE, (radius, radius), radius * 3 // 4)
+            if step:
+                arc_rect = pygame.Rect(0, 0, radius * 3 // 2, radius * 3 // 2)
+                arc_rect.center = (radius, radius)
+                start = 1.5708
+                pygame.draw.arc(surface, BLUE, arc_rect, start, start + 6.2832 * step / steps, max(1, radius // 3))
+            return surface
+
+        def value(pose):
+            progress = progress_fn(pose)
+            if progress is None:
+                return None
+            return max(0, min(steps, int(progress * steps)))
+
+        offset = lambda pose: (pose.rect.centerx, pose.rect.y - 55)
+        return self.attach(AttachedWidget(value, render, fighter, offset))
+
+    def update(self, scene):
+        # Poll bound values; only widgets whose value changed re-rasterise
+        for widget in self.screen_widgets:
+            if widget.refresh(scene):
+                self.rebuilds += 1
+        poses = {pose.fighter: pose for pose in scene.poses()}
+        for widget in self.attached_widgets:
+            pose = poses.get(widget.fighter)
+            if pose is not None and widget.refresh(pose):
+                self.rebuilds += 1
+        self.poses = poses
+
+    def invalidate(self):
+        for widget in self.screen_widgets + self.attached_widgets:
+            widget.invalidate()
+
+    def draw(self, queue):
+        # One blit per visible widget from its cached surface
+        for widget in self.screen_widgets:
+            if widget.surface:
+                queue.submit(HUD, 0, widget.surface, widget.rect)
+
+        view = self.view
+        for widget in self.attached_widgets:
+            pose = self.poses.get(widget.fighter)
+            if widget.surface and pose is not None:
+                position = view.point(*widget.offset_fn(pose))
+                rect = widget.surface.get_rect(**{widget.anchor: position})
+                queue.submit(INDICATORS, pose.rect.bottom, widget.surface, rect)
@@ -1,12 +1,31 @@
 import pygame
+import random
 import sys
+import time
 from player import Player
 from enemy import Enemy
 from background import Background
+from particles import ParticleSystem
+from render_queue import RenderQueue, GROUND, OVERLAY
+from hud import HUDLayer
+from pacing import FramePacer
+from ai_scheduler import AIScheduler, REPLAY_MAX_THINKS
+from timers import TimerWheel
+from telemetry import Telemetry, ROUND_RESULT, PLAYER as PLAYER_ACTOR, ENEMY as ENEMY_ACTOR
+from replay import ReplayRecorder
+from hot_reload import AssetWatcher
+from audio import init_mixer, sounds
+from asset_memory import memory
+from controls import InputHandler, LEFT, RIGHT, JUMP, ATTACK, TELEPORT, PAUSE, RESTART
+from render_target import RenderTarget
+from camera import Camera
+from scene import Scene
+from sim_thread import SimulationThread, TickStats
+from settings import WORLD_HEIGHT, STAGE_WIDTH, STAGE_LEFT, RENDER_SIZE, WINDOW_SIZE, FRAME_PACING, TELEMETRY, TELEMETRY_DIR, RECORD_REPLAY, HOT_RELOAD, MEMORY_OVERLAY, SIM_THREAD
 
+# HUD layout is authored for this screen size and scaled to the render target
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
-FPS = 60
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -16,17 +35,64 @@ GREEN = (0, 255, 0)
 YELLOW = (255, 255, 0)
 
 class Game:
-    def __init__(self):
+    def __init__(self, render_size=RENDER_SIZE, window_size=WINDOW_SIZE, seed=None):
+        # The mixer format is fixed before pygame.init() opens the audio device
+        init_mixer()
         pygame.init()
-        pygame.mixer.init()  
         
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # All match randomness comes from one seeded generator so replays re-simulate exactly
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        
+        # The scene is drawn at the internal resolution and scaled once per frame
+        self.render_target = RenderTarget(window_size, render_size, vsync=FRAME_PACING == "vsync")
+        self.screen = self.render_target.surface
+        self.view = self.render_target.view
         pygame.display.set_caption("2D Fighter")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        self.input = InputHandler()
+        self.input.install_event_filter()
+        # Timed pacing stands in when a vsync window could not be opened
+        pacing = FRAME_PACING
+        if pacing == "vsync" and not self.render_target.vsync:
+            pacing = "sleep"
+        self.pacer = FramePacer(mode=pacing)
+        self.last_scene = None
+        self.font = pygame.font.Font(None, self.view.length(36))
+        self.small_font = pygame.font.Font(None, self.view.length(24))
 
-        self.background = Background(SCREEN_WIDTH, SCREEN_HEIGHT)
+        # The camera scrolls the view across the stage; backgrounds are loaded at stage width
+        self.camera = Camera()
+        self.background = Background(*self.screen.get_size(), stage_width=self.view.length(STAGE_WIDTH))
+        self.particles = ParticleSystem(seed=self.seed)
+        self.render_queue = RenderQueue()
+        self.hud = HUDLayer(self.view)
+        # A wall-clock AI budget would make recorded matches drift when re-simulated
+        self.ai_scheduler = AIScheduler(max_thinks=REPLAY_MAX_THINKS if RECORD_REPLAY else None)
+        self.timers = TimerWheel()
+        
+        # One telemetry writer per session; a restart keeps appending to it
+        self.telemetry = Telemetry(TELEMETRY_DIR, TELEMETRY).start() if TELEMETRY else None
+        if self.telemetry:
+            self.telemetry.timers = self.timers
+        
+        # Replay recording covers the first match of the session
+        self.recorder = ReplayRecorder(RECORD_REPLAY, self.seed) if RECORD_REPLAY else None
+        
+        # Asset folders are watched for the whole session in development mode
+        self.assets = None
+        if HOT_RELOAD:
+            self.assets = AssetWatcher([Player.asset_path, Enemy.asset_path, Background.folder]).start()
+        
+        # Ground strip and dimming overlay only depend on the render size; the strip is
+        # uniform, so it stays put on screen while the camera scrolls
+        self.ground_rect = pygame.Rect(0, self.view.screen_point(0, WORLD_HEIGHT - 50)[1],
+                                       self.screen.get_width(), self.view.length(50))
+        self.ground_surface = memory.track(pygame.Surface(self.ground_rect.size), "ground", "screen")
+        self.ground_surface.set_alpha(200)  
+        self.ground_surface.fill(WHITE)
+        self.overlay = memory.track(pygame.Surface(self.screen.get_size()), "overlay", "screen")
+        self.overlay.set_alpha(128)
+        self.overlay.fill(BLACK)
         
         # Load sounds
         self.load_sounds()
@@ -38,10 +104,9 @@ class Game:
         self.enemy_wins = 0
         self.round_over = False
         self.game_over = False
-        self.round_transition_timer = 0
+        self.round_transition = None
         self.round_transition_delay = 180  
         self.paused = False
-        self.space_pressed = False  
         
         # Sound state
         self.player_running = False
@@ -49,21 +114,16 @@ class Game:
         
         # Create player and enemies
         self.reset_round()
+        self.build_hud()
     
     def load_sounds(self):
         # Load sound effects and music
         try:
-            # Sound effects
-            self.attack_sound = pygame.mixer.Sound("assets/audio/attack/slash.wav")
-            self.jump_sound = pygame.mixer.Sound("assets/audio/jump/jump.wav")
-            self.teleport_sound = pygame.mixer.Sound("assets/audio/teleport/teleport.wav")
-            self.run_sound = pygame.mixer.Sound("assets/audio/run/run.wav")
-            
-            # Set volumes for sound effects 
-            self.attack_sound.set_volume(0.7)
-            self.jump_sound.set_volume(0.8)
-            self.teleport_sound.set_volume(0.7)
-            self.run_sound.set_volume(0.8)  
+            # Sound effects, converted to the mixer format once and shared
+            self.attack_sound = sounds.load("assets/audio/attack/slash.wav", 0.7)
+            self.jump_sound = sounds.load("assets/audio/jump/jump.wav", 0.8)
+            self.teleport_sound = sounds.load("assets/audio/teleport/teleport.wav", 0.7)
+            self.run_sound = sounds.load("assets/audio/run/run.wav", 0.8)
             
             # Background music
             pygame.mixer.music.load("assets/audio/music/music.wav")
@@ -123,28 +183,33 @@ class Game:
         # Reset player
         if hasattr(self, 'player'):
             # Reset existing player
-            self.player.rect.x = 200
+            self.player.rect.x = STAGE_LEFT + 200
             self.player.rect.y = 400
             self.player.health = 100
             self.player.velocity_y = 0
             self.player.is_jumping = False
             self.player.attack_cooldown = 0
             self.player.is_moving = False
-            self.player.health_regen_timer = 0
             self.player.set_state("idle")
         else:
             # Create player first time
-            self.player = Player(200, 400, 62, 58, BLUE)
+            self.player = Player(STAGE_LEFT + 200, 400, 62, 58, BLUE, effects=self.particles, timers=self.timers,
+                                 telemetry=self.telemetry)
         
-        # Create enemy
-        self.enemies = []
-        enemy = Enemy(800, 400, 62, 58, RED)
-        self.enemies.append(enemy)
+        # Reuse the enemy from the last round, its animations are already loaded
+        if hasattr(self, 'enemies'):
+            for enemy in self.enemies:
+                enemy.reset(STAGE_LEFT + 800, 400)
+        else:
+            self.enemies = [Enemy(STAGE_LEFT + 800, 400, 62, 58, RED, effects=self.particles, timers=self.timers,
+                                  telemetry=self.telemetry, rng=self.rng)]
+        self.attach_fighter_widgets()
+        self.camera.reset()
         
         self.round_over = False
-        self.round_transition_timer = 0
+        self.round_transition = None
         self.paused = False
-        self.space_pressed = False
+        self.input.reset()
         
         # Stop running sounds when round resets
         if hasattr(self, 'run_sound') and self.run_sound:
@@ -158,99 +223,114 @@ class Game:
             self.music_started = True
     
     def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_z and not self.game_over and not self.round_over and not self.paused:
-                    # Teleport player
-                    self.player.teleport()
-                    # Play teleport sound
-                    if hasattr(self, 'teleport_sound') and self.teleport_sound:
-                        self.teleport_sound.play()
-                        
-                if event.key == pygame.K_ESCAPE:
-                    return False
-                if event.key == pygame.K_SPACE and not self.game_over and not self.round_over:
-                    # Toggle pause only when key is first pressed
-                    if not self.space_pressed:
-                        self.paused = not self.paused
-                        self.space_pressed = True
-                        # Pause/resume music when game is paused
-                        if self.paused:
-                            pygame.mixer.music.pause()
-                            # Also stop running sounds when paused
-                            if hasattr(self, 'run_sound') and self.run_sound:
-                                self.run_sound.stop()
-                        else:
-                            pygame.mixer.music.unpause()
-                            
-                if event.key == pygame.K_UP and not self.game_over and not self.round_over and not self.paused:
-                    self.player.jump()
-                    # Play jump sound
-                    if hasattr(self, 'jump_sound') and self.jump_sound:
-                        self.jump_sound.play()
-                        
-                if event.key == pygame.K_x and not self.game_over and not self.round_over and not self.paused:
-                    # Attack all enemies
-                    for enemy in self.enemies:
-                        if enemy.health > 0: 
-                            self.player.attack(enemy)
-                            # Play attack sound
-                            if hasattr(self, 'attack_sound') and self.attack_sound:
-                                self.attack_sound.play()
-                                
-                if event.key == pygame.K_r and self.game_over:
-                    self.__init__()  # Reset the entire game
-        
-        # Reset space pressed flag when spacebar is released
-        keys = pygame.key.get_pressed()
-        if not keys[pygame.K_SPACE]:
-            self.space_pressed = False
-        
-        # Update player movement state
-        if not self.game_over and not self.round_over and not self.paused:
-            keys = pygame.key.get_pressed()
-            
-            # Reset movement state
-            self.player.is_moving = False
+        # Build this tick's input snapshot, gameplay reads it in update()
+        snapshot = self.input.poll()
+        if snapshot.quit:
+            return False
+        if self.input.exposed:
+            # Idle screens are only drawn on change; this one has to be drawn again now
+            self.last_scene = None
+        self.apply_system_input(snapshot)
+        return True
+    
+    def apply_system_input(self, snapshot):
+        # Pause and restart, shared by live play and replays
+        if snapshot.pressed_now(PAUSE) and not self.game_over and not self.round_over:
+            self.input.acknowledge(PAUSE)
+            self.paused = not self.paused
+            # Presses buffered before or during the pause must not fire on resume. The
+            # threaded loop only ticks on presses while paused, so they would not expire.
+            self.input.reset()
+            # Pause/resume music when game is paused
+            if self.paused:
+                pygame.mixer.music.pause()
+                # Also stop running sounds when paused
+                if hasattr(self, 'run_sound') and self.run_sound:
+                    self.run_sound.stop()
+            else:
+                pygame.mixer.music.unpause()
+        
+        if snapshot.pressed_now(RESTART) and self.game_over:
+            self.reset_match()
+    
+    def apply_player_input(self, snapshot):
+        # Buffered commands fire on the first tick the player is able to do them
+        if self.player.can_teleport() and self.input.consume(TELEPORT):
+            self.player.teleport()
+            # Play teleport sound
+            if hasattr(self, 'teleport_sound') and self.teleport_sound:
+                self.teleport_sound.play()
+        
+        if self.player.can_jump() and self.input.consume(JUMP):
+            self.player.jump()
+            # Play jump sound
+            if hasattr(self, 'jump_sound') and self.jump_sound:
+                self.jump_sound.play()
+        
+        if self.player.can_attack() and self.input.consume(ATTACK):
+            # Attack all enemies
+            for enemy in self.enemies:
+                if enemy.health > 0:
+                    self.player.attack(enemy)
+            # Play attack sound
+            if hasattr(self, 'attack_sound') and self.attack_sound:
+                self.attack_sound.play()
+        
+        # Reset movement state
+        self.player.is_moving = False
+        
+        # Player controls 
+        dx = 0
+        if snapshot.held(LEFT):
+            dx = -5
+            self.player.is_moving = True
+            self.player.facing_right = False
+            self.input.acknowledge(LEFT)
+        elif snapshot.held(RIGHT):
+            dx = 5
+            self.player.is_moving = True
+            self.player.facing_right = True
+            self.input.acknowledge(RIGHT)
+        
+        # Move player and check collisions with enemy
+        if dx != 0:
+            # Move player temporarily
+            self.player.rect.x += dx
             
-            # Player controls 
-            dx = 0
-            if keys[pygame.K_LEFT]:
-                dx = -5
-                self.player.is_moving = True
-                self.player.facing_right = False
-            elif keys[pygame.K_RIGHT]:
-                dx = 5
-                self.player.is_moving = True
-                self.player.facing_right = True
+            # Check collision with enemy
+            for enemy in self.enemies:
+                if (enemy.health > 0 and 
+                    self.player.rect.colliderect(enemy.rect) and
+                    abs(self.player.rect.centery - enemy.rect.centery) < 50):
+                    
+                    # Push player to the appropriate side of the enemy
+                    if dx > 0:  # Moving right
+                        self.player.rect.right = enemy.rect.left
+                    else:  # Moving left
+                        self.player.rect.left = enemy.rect.right
+                    break 
             
-            # Move player and check collisions with enemy
-            if dx != 0:
-                # Move player temporarily
-                self.player.rect.x += dx
-                
-                # Check collision with enemy
-                for enemy in self.enemies:
-                    if (enemy.health > 0 and 
-                        self.player.rect.colliderect(enemy.rect) and
-                        abs(self.player.rect.centery - enemy.rect.centery) < 50):
-                        
-                        # Push player to the appropriate side of the enemy
-                        if dx > 0:  # Moving right
-                            self.player.rect.right = enemy.rect.left
-                        else:  # Moving left
-                            self.player.rect.left = enemy.rect.right
-                        break 
-                
-            # Boundary checking 
-            if self.player.rect.left < 0:
-                self.player.rect.left = 0
-            if self.player.rect.right > SCREEN_WIDTH:
-                self.player.rect.right = SCREEN_WIDTH
-        
-        return True
+        # Boundary checking 
+        if self.player.rect.left < 0:
+            self.player.rect.left = 0
+        if self.player.rect.right > STAGE_WIDTH:
+            self.player.rect.right = STAGE_WIDTH
+    
+    def reset_match(self):
+        # Start a new match in place: the window, mixer, fonts and every loaded
+        # asset stay as they are, only match state goes back to the start
+        self.timers.clear()
+        self.round_transition = None
+        self.current_round = 1
+        self.player_wins = 0
+        self.enemy_wins = 0
+        self.game_over = False
+        self.particles.clear()
+        self.player.is_teleporting = False
+        self.player.teleport_cooldown = 0
+        self.player.facing_right = True
+        self.reset_round()
+        self.last_scene = None
     
     def next_round(self):
         self.current_round += 1
@@ -264,7 +344,9 @@ class Game:
         if self.player.health <= 0:
             self.enemy_wins += 1
             self.round_over = True
-            self.round_transition_timer = self.round_transition_delay
+            self.pause_regen()
+            self.record_round_result(ENEMY_ACTOR)
+            self.round_transition = self.timers.schedule(self.round_transition_delay, self.next_round)
             return
         
         # Check if the enemy is dead
@@ -272,22 +354,30 @@ class Game:
         if enemy_dead:
             self.player_wins += 1
             self.round_over = True
-            self.round_transition_timer = self.round_transition_delay
+            self.pause_regen()
+            self.record_round_result(PLAYER_ACTOR)
+            self.round_transition = self.timers.schedule(self.round_transition_delay, self.next_round)
             # Check if this was the final round
             if self.current_round >= self.max_rounds:
                 self.game_over = True
     
+    def pause_regen(self):
+        # Health stays as the round ended while the result is on screen
+        for fighter in [self.player] + self.enemies:
+            fighter.pause_regen()
+    
+    def record_round_result(self, winner):
+        if self.telemetry:
+            self.telemetry.record(ROUND_RESULT, winner, self.current_round, self.player_wins, self.enemy_wins)
+    
     def update(self):
         if not self.game_over and not self.paused:
-            if self.round_over:
-                # Handle round transition
-                self.round_transition_timer -= 1
-                if self.round_transition_timer <= 0:
-                    self.next_round()
-            else:
-                # Update cooldowns
-                if self.player.attack_cooldown > 0:
-                    self.player.attack_cooldown -= 1
+            # Cooldowns, regen and the round transition all run off the wheel
+            self.timers.advance()
+            
+            if not self.round_over:
+                # Apply this tick's controls before anything moves
+                self.apply_player_input(self.input.snapshot)
                 
                 # Update characters
                 living_enemies = [enemy for enemy in self.enemies if enemy.health > 0]
@@ -301,132 +391,317 @@ class Game:
                     if enemy.health > 0:  
                         enemy.update(self.player)
                 
+                # Enemy decisions are spread across ticks within the AI budget
+                living_enemies = [enemy for enemy in self.enemies if enemy.health > 0]
+                self.ai_scheduler.run(living_enemies, self.player)
+                
                 # Check for round winner
                 self.check_round_winner()
+            
+            # Effects keep playing out during the round transition
+            self.particles.update()
+            self.camera.follow([self.player] + self.enemies, self.round_over)
         
         # Handle running sounds 
         self.handle_run_sounds()
     
-    def draw(self):
+    def draw(self, scene=None):
+        self.render_scene(scene=scene)
+        self.render_target.present()
+        # Presses acted on up to the drawn tick are now on screen
+        self.input.presented(scene.input_tick if scene is not None else None)
+    
+    def snapshot(self, copy=False):
+        # Everything drawing reads, as an immutable Scene. With copy=False the particles are
+        # views into the live arrays, fine as long as the scene is drawn before the next update.
+        return Scene(self.timers.now, self.player.pose(), tuple(enemy.pose() for enemy in self.enemies),
+                     self.particles.frame(copy), self.camera.frame(), self.current_round, self.max_rounds,
+                     self.player_wins, self.enemy_wins, self.round_over, self.game_over, self.paused,
+                     self.round_transition_timer, self.input.tick)
+    
+    def render_scene(self, surface=None, scene=None):
+        # Draw the frame into the render surface, or another one of the same size, without presenting it.
+        # Only the scene is read, so a worker thread may be simulating the next tick meanwhile.
+        if scene is None:
+            scene = self.snapshot()
+        # Cached sprites drawn from here on are safe from eviction until the next frame
+        memory.next_frame()
+        queue = self.render_queue
+        view = self.view
+        view.look(scene.camera)
+        
         # Draw background instead of black screen
-        self.background.draw(self.screen)
+        self.background.draw(queue, view)
         
         # Draw ground 
-        ground_surface = pygame.Surface((SCREEN_WIDTH, 50))
-        ground_surface.set_alpha(200)  
-        ground_surface.fill(WHITE)
-        self.screen.blit(ground_surface, (0, SCREEN_HEIGHT - 50))
+        queue.submit(GROUND, 0, self.ground_surface, self.ground_rect)
         
-        # Draw characters
-        self.player.draw(self.screen)
-        for enemy in self.enemies:
-            if enemy.health > 0:  
-                enemy.draw(self.screen)
+        # Draw characters, skipping anyone the camera cannot see
+        if view.visible(scene.player.rect):
+            self.player.draw(queue, view, scene.player)
+        for pose in scene.enemies:
+            if pose.health > 0 and view.visible(pose.rect):
+                pose.fighter.draw(queue, view, pose)
+        self.particles.draw(queue, view, scene.particles)
         
         # Draw UI
-        self.draw_ui()
+        self.hud.update(scene)
+        self.hud.draw(queue)
         
         # Draw round over screen
-        if self.round_over and not self.game_over:
-            self.draw_round_over()
+        if scene.round_over and not scene.game_over:
+            self.draw_round_over(scene)
         
         # Draw game over screen
-        if self.game_over:
-            self.draw_game_over()
+        if scene.game_over:
+            self.draw_game_over(scene)
         
         # Draw pause screen
-        if self.paused:
+        if scene.paused:
             self.draw_pause_screen()
         
-        pygame.display.flip()
+        # One sorted pass of batched blits
+        queue.flush(self.screen if surface is None else surface)
     
-    def draw_ui(self):        
-        # Draw health labels
-        player_health_text = self.font.render(f"Player: {self.player.health}", True, BLUE)
-        self.screen.blit(player_health_text, (10, 50))
-        
-        # Draw round info
-        round_text = self.font.render(f"Round: {self.current_round}/{self.max_rounds}", True, WHITE)
-        self.screen.blit(round_text, (SCREEN_WIDTH // 2 - round_text.get_width() // 2, 10))
-        
-        # Draw score
-        score_text = self.font.render(f"Player: {self.player_wins} - Enemy: {self.enemy_wins}", True, WHITE)
-        self.screen.blit(score_text, (SCREEN_WIDTH - 200, 10))
-        
-        # Draw enemy health
-        if self.enemies[0].health > 0:
-            enemy_health_text = self.small_font.render(f"Enemy: {self.enemies[0].health}", True, RED)
-            self.screen.blit(enemy_health_text, (SCREEN_WIDTH - 200, 50))
+    def build_hud(self):
+        # Screen labels re-render only when the values they show change
+        hud = self.hud
+        hud.add_text(self.font, BLUE, "Player: {}", lambda scene: (scene.player.health,), "topleft", (10, 50))
+        hud.add_text(self.font, WHITE, "Round: {}/{}", lambda scene: (scene.current_round, scene.max_rounds),
+                     "midtop", (SCREEN_WIDTH // 2, 10))
+        hud.add_text(self.font, WHITE, "Player: {} - Enemy: {}", lambda scene: (scene.player_wins, scene.enemy_wins),
+                     "topleft", (SCREEN_WIDTH - 200, 10))
+        hud.add_text(self.small_font, RED, "Enemy: {}",
+                     lambda scene: (scene.enemies[0].health,) if scene.enemies[0].health > 0 else None,
+                     "topleft", (SCREEN_WIDTH - 200, 50))
+        if MEMORY_OVERLAY:
+            # Whole tenths of a MB, so the label only re-renders when the total moves
+            hud.add_text(self.small_font, YELLOW, "Assets: {} MB",
+                         lambda scene: (round(memory.bytes / 2**20, 1),), "bottomleft", (10, SCREEN_HEIGHT - 10))
     
-    def draw_round_over(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
-        
-        if self.player.health <= 0:
+    def attach_fighter_widgets(self):
+        # Bars and indicators follow the fighters of the current round
+        hud = self.hud
+        hud.detach_all()
+        player = self.player
+        hud.attach_health_bar(player)
+        hud.attach_cooldown_ring(player, lambda pose: pose.teleport_progress)
+        hud.attach_regen_indicator(player, lambda pose: pose.regenerating and not pose.is_teleporting)
+        for enemy in self.enemies:
+            hud.attach_health_bar(enemy)
+            hud.attach_regen_indicator(enemy, lambda pose: pose.regenerating)
+    
+    def capture_state(self):
+        # Everything the simulation needs to carry on from this tick, as plain values
+        transition = self.round_transition
+        return {
+            "tick": self.timers.now,
+            "rng": self.rng.getstate(),
+            "current_round": self.current_round,
+            "player_wins": self.player_wins,
+            "enemy_wins": self.enemy_wins,
+            "round_over": self.round_over,
+            "game_over": self.game_over,
+            "paused": self.paused,
+            "round_transition": transition.deadline if transition and not transition.cancelled else None,
+            "player": self.player.capture_state(),
+            "enemies": [enemy.capture_state() for enemy in self.enemies],
+            "input": self.input.capture_state(),
+            "ai": self.ai_scheduler.capture_state(self.enemies),
+            "particles": self.particles.capture_state(),
+            "camera": self.camera.capture_state(),
+        }
+    
+    def restore_state(self, state):
+        # Pending wheel callbacks are dropped and re-armed from the stored deadlines
+        self.timers.clear()
+        self.timers.now = state["tick"]
+        self.rng.setstate(state["rng"])
+        for name in ("current_round", "player_wins", "enemy_wins", "round_over", "game_over", "paused"):
+            setattr(self, name, state[name])
+        self.round_transition = None
+        if state["round_transition"] is not None:
+            self.round_transition = self.timers.schedule(state["round_transition"] - self.timers.now,
+                                                         self.next_round)
+        
+        self.player.restore_state(state["player"])
+        while len(self.enemies) < len(state["enemies"]):
+            self.enemies.append(Enemy(STAGE_LEFT + 800, 400, 62, 58, RED, effects=self.particles, timers=self.timers,
+                                      telemetry=self.telemetry, rng=self.rng))
+        del self.enemies[len(state["enemies"]):]
+        for enemy, enemy_state in zip(self.enemies, state["enemies"]):
+            enemy.restore_state(enemy_state)
+        self.attach_fighter_widgets()
+        
+        self.input.restore_state(state["input"])
+        self.ai_scheduler.restore_state(state["ai"], self.enemies)
+        self.particles.restore_state(state["particles"])
+        self.camera.restore_state(state.get("camera", (STAGE_LEFT, 1.0)))
+        self.last_scene = None
+    
+    def text(self, font, string, color):
+        # Overlay lines are rendered once per distinct string
+        return self.render_queue.sprites.get(("text", id(font), string, color),
+                                             lambda: font.render(string, True, color))
+    
+    def centered(self, text, y):
+        # Position that centres a rendered line horizontally at a layout y
+        return (self.screen.get_width() // 2 - text.get_width() // 2, self.view.screen_point(0, y)[1])
+    
+    def draw_message(self, lines):
+        # Dim the scene and show up to three centred lines on top
+        queue = self.render_queue
+        queue.submit(OVERLAY, 0, self.overlay, (0, 0))
+        for text, y in zip(lines, (SCREEN_HEIGHT // 2 - 50, SCREEN_HEIGHT // 2, SCREEN_HEIGHT // 2 + 50)):
+            queue.submit(OVERLAY, 1, text, self.centered(text, y))
+    
+    def draw_round_over(self, scene):
+        if scene.player.health <= 0:
             winner = "ENEMY"
             color = RED
         else:
             winner = "PLAYER"
             color = GREEN
         
-        round_over_text = self.font.render(f"ROUND OVER - {winner} WINS!", True, color)
+        round_over_text = self.text(self.font, f"ROUND OVER - {winner} WINS!", color)
         
         # Show countdown timer
-        seconds_left = (self.round_transition_timer // 60) + 1
-        countdown_text = self.font.render(f"Next round in: {seconds_left}", True, WHITE)
-        score_text = self.font.render(f"Score: Player {self.player_wins} - {self.enemy_wins} Enemy", True, WHITE)
+        seconds_left = (scene.transition_ticks // 60) + 1
+        countdown_text = self.text(self.font, f"Next round in: {seconds_left}", WHITE)
+        score_text = self.text(self.font, f"Score: Player {scene.player_wins} - {scene.enemy_wins} Enemy", WHITE)
         
-        self.screen.blit(round_over_text, (SCREEN_WIDTH // 2 - round_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
-        self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 2))
-        self.screen.blit(countdown_text, (SCREEN_WIDTH // 2 - countdown_text.get_width() // 2, SCREEN_HEIGHT // 2 + 50))
+        self.draw_message([round_over_text, score_text, countdown_text])
     
-    def draw_game_over(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
-        
-        if self.player_wins > self.enemy_wins:
+    def draw_game_over(self, scene):
+        if scene.player_wins > scene.enemy_wins:
             winner = "PLAYER"
             color = GREEN
         else:
             winner = "ENEMY"
             color = RED
             
-        game_over_text = self.font.render(f"GAME OVER - {winner} WINS THE MATCH!", True, color)
-        final_score_text = self.font.render(f"Final Score: {self.player_wins} - {self.enemy_wins}", True, WHITE)
-        restart_text = self.font.render("Press R to restart", True, WHITE)
+        game_over_text = self.text(self.font, f"GAME OVER - {winner} WINS THE MATCH!", color)
+        final_score_text = self.text(self.font, f"Final Score: {scene.player_wins} - {scene.enemy_wins}", WHITE)
+        restart_text = self.text(self.font, "Press R to restart", WHITE)
         
-        self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
-        self.screen.blit(final_score_text, (SCREEN_WIDTH // 2 - final_score_text.get_width() // 2, SCREEN_HEIGHT // 2))
-        self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 50))
+        self.draw_message([game_over_text, final_score_text, restart_text])
     
     def draw_pause_screen(self):
-        # Create semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
-        
         # Draw pause text
-        pause_text = self.font.render("GAME PAUSED", True, YELLOW)
-        instruction_text = self.font.render("Press SPACE to resume", True, WHITE)
-        controls_text = self.small_font.render("Controls: ARROWS to move, X to attack, Z to Teleport", True, WHITE)
+        pause_text = self.text(self.font, "GAME PAUSED", YELLOW)
+        instruction_text = self.text(self.font, "Press SPACE to resume", WHITE)
+        controls_text = self.text(self.small_font, "Controls: ARROWS to move, X to attack, Z to Teleport", WHITE)
         
-        self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
-        self.screen.blit(instruction_text, (SCREEN_WIDTH // 2 - instruction_text.get_width() // 2, SCREEN_HEIGHT // 2))
-        self.screen.blit(controls_text, (SCREEN_WIDTH // 2 - controls_text.get_width() // 2, SCREEN_HEIGHT // 2 + 50))
+        self.draw_message([pause_text, instruction_text, controls_text])
+    
+    def is_idle(self):
+        # Nothing on screen moves, so frames can be rare and skipped
+        if self.paused or self.game_over:
+            return True
+        # The round-ending punch-in keeps zooming and panning after the effects are gone
+        return self.round_over and self.particles.count == 0 and self.camera.settled()
+    
+    @property
+    def round_transition_timer(self):
+        # Ticks until the next round starts
+        if self.round_transition is None:
+            return 0
+        return self.timers.remaining(self.round_transition.deadline)
+    
+    def scene_signature(self):
+        # Everything that can change what an idle screen shows
+        return (self.paused, self.round_over, self.game_over, self.current_round,
+                self.player_wins, self.enemy_wins, self.round_transition_timer // 60)
+    
+    def needs_redraw(self):
+        if not self.is_idle():
+            self.last_scene = None
+            return True
+        scene = self.scene_signature()
+        if scene == self.last_scene:
+            return False
+        self.last_scene = scene
+        return True
     
     def run(self):
+        if SIM_THREAD:
+            self.run_threaded()
+            return
         running = True
+        ticks = 1
         while running:
+            if self.assets:
+                # Reloaded sprites are swapped in between frames
+                self.assets.apply(self)
+            if self.recorder:
+                self.recorder.keyframe(self)
             running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
-        
+            updates = 0
+            was_idle = self.is_idle()
+            for _ in range(ticks):
+                self.update()
+                updates += 1
+                # Idle catch-up ticks stop as soon as play resumes
+                if was_idle and not self.is_idle():
+                    break
+            if self.recorder:
+                self.recorder.record(self.input.snapshot, updates)
+                if self.game_over:
+                    self.recorder.finish()
+            if self.needs_redraw():
+                self.draw()
+            ticks = self.pacer.wait(self.is_idle())
+        self.shutdown()
+    
+    def run_threaded(self):
+        # The match runs on a worker thread at a fixed tick rate; this thread only reads
+        # events, draws the latest published scene and presents it. Recording happens per
+        # tick on the worker, and hot reloads wait for the tick in progress to finish.
+        events = InputHandler()
+        simulation = SimulationThread(self).start()
+        frames = TickStats("Render thread frames")
+        last_scene = None
+        while simulation.thread.is_alive():
+            snapshot = events.poll()
+            if snapshot.quit:
+                break
+            # Presses polled here carry their drain times over, so input latency still counts
+            stamps = {action: stamp for action, (stamp, tick) in events.event_times.items() if tick == events.tick}
+            simulation.submit(snapshot.pressed, snapshot.just_pressed, stamps)
+            if events.exposed:
+                last_scene = None
+            if self.assets:
+                with simulation.tick_lock:
+                    self.assets.apply(self)
+                    last_scene = None
+            scene = simulation.latest()
+            if scene is not last_scene:
+                started = time.perf_counter()
+                self.draw(scene)
+                frames.add(time.perf_counter() - started)
+                last_scene = scene
+            self.pacer.wait(scene.paused or scene.game_over)
+        simulation.stop()
+        if simulation.error is not None:
+            # The match died mid-tick; showing its last frame forever would look like a hang
+            pygame.quit()
+            raise simulation.error
+        print(simulation.summary())
+        print(frames.summary())
+        self.shutdown()
+    
+    def shutdown(self):
+        print(self.input.latency.summary())
+        print(self.pacer.stats.summary())
+        print(self.ai_scheduler.summary())
+        print(sounds.summary())
+        print(memory.summary())
+        if self.recorder:
+            self.recorder.finish()
+        if self.telemetry:
+            # Blocks only until the last batch is on disk
+            self.telemetry.close()
+            print(self.telemetry.summary())
         pygame.quit()
         sys.exit()
 
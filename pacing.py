@@ -0,0 +1,79 @@
+import time
+import pygame
+from collections import deque
+from settings import FPS, IDLE_FPS, FRAME_PACING
+
+MAX_VSYNC_TICKS = 4  # a vsync frame later than this many ticks drops the rest instead of racing
+
+
+class FrameStats:
+    # Frame-to-frame intervals of active frames, for jitter reporting
+    def __init__(self, target_fps=FPS, history=600):
+        self.target_ms = 1000 / target_fps
+        self.intervals = deque(maxlen=history)
+        self.missed = 0
+        self.frames = 0
+
+    def add(self, interval_ms):
+        self.frames += 1
+        self.intervals.append(interval_ms)
+        if interval_ms > self.target_ms * 1.5:
+            self.missed += 1
+
+    def summary(self):
+        if not self.intervals:
+            return "Frame pacing: no samples"
+        samples = sorted(self.intervals)
+        count = len(samples)
+        mean = sum(samples) / count
+        jitter = (sum((s - mean) ** 2 for s in samples) / count) ** 0.5
+        p99 = samples[min(count - 1, int(count * 0.99))]
+        return (f"Frame pacing: mean {mean:.2f} ms, jitter {jitter:.2f} ms, "
+                f"p99 {p99:.2f} ms, missed {self.missed}/{self.frames}")
+
+
+class FramePacer:
+    # Holds the loop to the target rate while playing and drops to IDLE_FPS when nothing moves.
+    # With vsync the display sets the frame rate and ticks are counted from elapsed time.
+    def __init__(self, fps=FPS, idle_fps=IDLE_FPS, mode=FRAME_PACING):
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.mode = mode
+        self.clock = pygame.time.Clock()
+        self.stats = FrameStats(fps)
+        self.last_frame = time.perf_counter()
+        self.pending_time = 0.0
+        self.idle = False
+
+    def wait(self, idle):
+        # Sleep until the next frame and return how many simulation ticks are due
+        if idle:
+            self.clock.tick(self.idle_fps)
+        elif self.mode == "vsync":
+            # display.flip already blocked on the vertical blank, just measure
+            self.clock.tick()
+        elif self.mode == "busy":
+            self.clock.tick_busy_loop(self.fps)
+        else:
+            self.clock.tick(self.fps)
+
+        now = time.perf_counter()
+        elapsed = now - self.last_frame
+        self.last_frame = now
+
+        if not idle and not self.idle:
+            self.stats.add(elapsed * 1000)
+        if idle or self.mode == "vsync":
+            # Keep timers running in real time even though frames are sparse, or come at
+            # the display's refresh rate rather than the tick rate
+            self.pending_time += elapsed
+            ticks = int(self.pending_time * self.fps)
+            self.pending_time -= ticks / self.fps
+            if not idle and ticks > MAX_VSYNC_TICKS:
+                ticks = MAX_VSYNC_TICKS
+                self.pending_time = 0.0
+        else:
+            self.pending_time = 0.0
+            ticks = 1
+        self.idle = idle
+        return ticks
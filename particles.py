@@ -0,0 +1,172 @@
+import pygame
+from settings import GROUND_Y
+from render_queue import EFFECTS
+from asset_memory import memory
+from scene import ParticleFrame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_PARTICLES = 12000
+FADE_STEPS = 8  # pre-rendered alpha levels per colour
+PARTICLE_SIZE = 4  # world units
+
+# Palette indices, one pre-rendered sprite strip per entry
+SPARK = 0
+SPARK_HOT = 1
+DUST = 2
+TELEPORT = 3
+PALETTE = [
+    (255, 220, 80),
+    (255, 255, 230),
+    (170, 150, 120),
+    (120, 200, 255),
+]
+
+
+class ParticleSystem:
+    # Structure-of-arrays particles, updated with NumPy and drawn as one Surface.blits batch
+    def __init__(self, capacity=MAX_PARTICLES, seed=None):
+        self.enabled = np is not None
+        self.count = 0
+        self.dropped = 0
+        self.sprites = {}  # render scale -> list of sprites indexed by colour * FADE_STEPS + fade
+        if not self.enabled:
+            print("NumPy not available, particle effects disabled")
+            return
+
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.max_life = np.ones(capacity, np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.color = np.zeros(capacity, np.int32)
+
+    def emit(self, x, y, count, color, speed=4.0, angle=0.0, spread=6.2832, life=30, gravity=0.0):
+        # Spawn a burst in one vectorised write, dropping what does not fit
+        if not self.enabled:
+            return
+        free = self.capacity - self.count
+        if count > free:
+            self.dropped += count - free
+            count = free
+        if count <= 0:
+            return
+
+        start, end = self.count, self.count + count
+        rng = self.rng
+        angles = angle + (rng.random(count, np.float32) - 0.5) * spread
+        speeds = speed * (0.3 + 0.7 * rng.random(count, np.float32))
+        lives = life * (0.5 + 0.5 * rng.random(count, np.float32))
+
+        self.pos[start:end, 0] = x
+        self.pos[start:end, 1] = y
+        self.vel[start:end, 0] = np.cos(angles) * speeds
+        self.vel[start:end, 1] = np.sin(angles) * speeds
+        self.life[start:end] = lives
+        self.max_life[start:end] = lives
+        self.gravity[start:end] = gravity
+        self.color[start:end] = color
+        self.count = end
+
+    def hit_sparks(self, x, y, facing_right):
+        # Sparks fly away from the attacker
+        direction = 0.0 if facing_right else 3.1416
+        self.emit(x, y, 24, SPARK, speed=7.0, angle=direction, spread=1.6, life=18, gravity=0.3)
+        self.emit(x, y, 8, SPARK_HOT, speed=4.0, angle=direction, spread=2.4, life=10)
+
+    def dust(self, x, y):
+        # Low puff along the ground, e.g. on landing
+        self.emit(x, y, 30, DUST, speed=3.0, angle=-1.5708, spread=3.0, life=28, gravity=0.15)
+
+    def teleport_burst(self, x, y):
+        self.emit(x, y, 40, TELEPORT, speed=5.0, life=20)
+
+    def update(self):
+        if not self.enabled or not self.count:
+            return
+        n = self.count
+        self.vel[:n, 1] += self.gravity[:n]
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= 1
+
+        # Compact survivors to the front so the live range stays contiguous
+        alive = (self.life[:n] > 0) & (self.pos[:n, 1] < GROUND_Y + PARTICLE_SIZE)
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            live = len(keep)
+            for array in (self.pos, self.vel, self.life, self.max_life, self.gravity, self.color):
+                array[:live] = array[keep]
+            self.count = live
+
+    def clear(self):
+        self.count = 0
+
+    def capture_state(self):
+        # Only the live range is copied
+        if not self.enabled:
+            return None
+        n = self.count
+        return {"rng": self.rng.bit_generator.state,
+                "arrays": [array[:n].copy() for array in
+                           (self.pos, self.vel, self.life, self.max_life, self.gravity, self.color)]}
+
+    def restore_state(self, state):
+        if not self.enabled or state is None:
+            return
+        self.rng.bit_generator.state = state["rng"]
+        arrays = state["arrays"]
+        n = len(arrays[0])
+        for array, saved in zip((self.pos, self.vel, self.life, self.max_life, self.gravity, self.color), arrays):
+            array[:n] = saved
+        self.count = n
+
+    def sprites_for(self, view):
+        # One solid square per colour and fade level, built once per render scale
+        sprites = self.sprites.get(view.scale)
+        if sprites is None:
+            size = view.length(PARTICLE_SIZE)
+            sprites = []
+            for color in PALETTE:
+                for step in range(FADE_STEPS):
+                    sprite = pygame.Surface((size, size)).convert()
+                    sprite.fill(color)
+                    sprite.set_alpha(255 * (step + 1) // FADE_STEPS)
+                    sprites.append(memory.track(sprite, "particles", "effect"))
+            self.sprites[view.scale] = sprites
+        return sprites
+
+    def frame(self, copy=False):
+        # The live particles for a render snapshot; views are enough when drawing happens
+        # before the next update, copies when the simulation runs on another thread
+        if not self.enabled or not self.count:
+            return None
+        n = self.count
+        arrays = (self.pos[:n], self.life[:n], self.max_life[:n], self.color[:n])
+        if copy:
+            arrays = [array.copy() for array in arrays]
+        return ParticleFrame(*arrays)
+
+    def draw(self, queue, view, frame):
+        if frame is None:
+            return
+        sprites = self.sprites_for(view)
+        half = PARTICLE_SIZE / 2
+
+        scale = view.world_scale
+        xs = ((frame.pos[:, 0] - half - view.offset_x) * scale).astype(np.int32)
+        ys = ((frame.pos[:, 1] - half - view.offset_y) * scale).astype(np.int32)
+        fade = (frame.life * FADE_STEPS / frame.max_life).astype(np.int32)
+        index = frame.color * FADE_STEPS + np.clip(fade, 0, FADE_STEPS - 1)
+
+        # Skip anything outside the surface before building the blit list
+        width, height = view.width, view.height
+        visible = (xs > -PARTICLE_SIZE * view.scale) & (xs < width) & (ys > -PARTICLE_SIZE * view.scale) & (ys < height)
+        if not visible.all():
+            xs, ys, index = xs[visible], ys[visible], index[visible]
+
+        queue.submit_batch(EFFECTS, 0, zip(map(sprites.__getitem__, index.tolist()), zip(xs.tolist(), ys.tolist())))
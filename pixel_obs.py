@@ -0,0 +1,96 @@
+import pygame
+from asset_memory import memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SPARE_BUFFERS = 8  # buffers readers may keep locked before observations are copied instead
+
+
+class PixelObserver:
+    # Renders the game into a ring of offscreen surfaces and hands out NumPy views of them.
+    # A frame is only exposed once it is fully drawn, and the next one goes into another
+    # surface, so readers never see a half-drawn frame. Views lock their surface; a surface
+    # still held by a reader is skipped and the ring grows instead of blocking, up to
+    # `spare` held surfaces. Past that, observations are copies and the ring stops growing.
+    def __init__(self, game, size=None, stack=1, spare=SPARE_BUFFERS):
+        if np is None:
+            raise RuntimeError("Pixel observations need NumPy")
+        self.game = game
+        self.size = tuple(size) if size else game.screen.get_size()
+        # Drawing straight into the buffers works when they match the render size
+        self.direct = self.size == game.screen.get_size()
+        self.stack = stack
+        self.limit = stack + 1 + spare
+        self.buffers = [self.new_buffer() for _ in range(stack + 1)]
+        self.history = []  # most recent buffers, oldest first
+        self.frames = 0
+
+    def new_buffer(self):
+        # Same pixel format as the render surface, so copies and scaling stay plain blits
+        return memory.track(pygame.Surface(self.size, 0, self.game.screen), "pixel observer", "screen")
+
+    def back_buffer(self, keep):
+        for buffer in self.buffers:
+            if not buffer.get_locked() and not any(buffer is kept for kept in keep):
+                return buffer
+        if len(self.buffers) >= self.limit:
+            # observation() stops handing out views before this can happen
+            raise RuntimeError(f"All {len(self.buffers)} pixel observation buffers are held by readers")
+        buffer = self.new_buffer()
+        self.buffers.append(buffer)
+        return buffer
+
+    def trim(self):
+        # Buffers grown for readers that have since let go are dropped again
+        surplus = len(self.buffers) - self.stack - 1
+        for buffer in list(self.buffers):
+            if surplus <= 0:
+                break
+            if not buffer.get_locked() and not any(buffer is published for published in self.history):
+                self.buffers.remove(buffer)
+                surplus -= 1
+
+    def can_hold(self, surfaces):
+        # Whether readers may lock these too and every later render still find a free buffer
+        held = {id(buffer) for buffer in self.buffers if buffer.get_locked()}
+        held.update(id(surface) for surface in surfaces)
+        return len(held) <= self.limit - self.stack
+
+    def render(self):
+        # Draw this tick's scene into a free buffer, then publish it
+        keep = self.history[len(self.history) - self.stack + 1:] if self.stack > 1 else []
+        buffer = self.back_buffer(keep)
+        if self.direct:
+            self.game.render_scene(buffer)
+        else:
+            self.game.render_scene()
+            pygame.transform.scale(self.game.screen, self.size, buffer)
+        self.history = keep + [buffer]
+        self.frames += 1
+        if len(self.buffers) > self.stack + 1:
+            self.trim()
+
+    def frame(self, surface=None, copy=False):
+        # (height, width, 3) uint8 view of a published frame, no pixels are copied.
+        # The view stays valid until `stack` more frames have been rendered.
+        if surface is None:
+            surface = self.history[-1]
+        view = pygame.surfarray.pixels3d(surface).transpose(1, 0, 2)
+        # Copying leaves the surface unlocked once the view goes out of scope
+        return view.copy() if copy else view
+
+    def observation(self):
+        # The latest frame, or the last `stack` frames oldest first (repeating the
+        # earliest one right after a reset)
+        frames = self.history[-self.stack:]
+        copy = not self.can_hold(frames)
+        if self.stack == 1:
+            return self.frame(frames[0], copy)
+        frames = [frames[0]] * (self.stack - len(frames)) + frames
+        return tuple(self.frame(surface, copy) for surface in frames)
+
+    def reset(self):
+        self.history = []
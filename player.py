@@ -1,6 +1,12 @@
 import pygame
 import os
-from animation import Animation
+from animation import Animation, memory_report
+from scene import FighterPose
+from settings import STAGE_WIDTH, GROUND_Y
+from hitbox import load_boxes, attack_hits
+from render_queue import FIGHTERS, INDICATORS
+from timers import TimerWheel, Countdown, RegeneratingHealth
+from telemetry import PLAYER, HIT, DAMAGE, JUMP, TELEPORT
 
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)
@@ -8,20 +14,37 @@ RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 
 class Player:
-    def __init__(self, x, y, width, height, color):
+    # Tick-based timers live on the shared wheel instead of being decremented every update
+    health = RegeneratingHealth()
+    attack_cooldown = Countdown()
+    teleport_cooldown = Countdown()
+    teleport_timer = Countdown()
+    
+    # One subfolder per animation state
+    asset_path = "assets/player/"
+    
+    # Attributes captured in replay keyframes
+    state_fields = ("velocity_y", "is_jumping", "base_health", "last_hit_tick", "regen_paused", "facing_right",
+                    "attack_cooldown_deadline", "attack_landed", "is_moving", "teleport_cooldown_deadline",
+                    "is_teleporting", "teleport_timer_deadline", "current_state")
+    
+    def __init__(self, x, y, width, height, color, effects=None, timers=None, telemetry=None):
+        self.timers = timers if timers is not None else TimerWheel()
+        self.telemetry = telemetry  # match event recorder, optional
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
+        self.effects = effects  # particle system, optional
         self.velocity_y = 0
         self.jump_power = -21
         self.gravity = 0.8
         self.is_jumping = False
-        self.health = 100
         self.max_health = 100
+        self.health_regen_delay = 180  
+        self.health = 100
         self.facing_right = True
         self.attack_cooldown = 0
+        self.attack_landed = False
         self.is_moving = False  # Track movement state
-        self.health_regen_timer = 0
-        self.health_regen_delay = 180  
         
         # Teleport properties
         self.teleport_cooldown = 0
@@ -38,30 +61,34 @@ class Player:
         
     def load_animations(self):
         #Load all animations for the player
-        base_path = "assets/player/"
+        base_path = self.asset_path
         
         # Load idle animation
         idle_frames = self.load_frames_from_folder(os.path.join(base_path, "idle"))
         if idle_frames:
-            self.states["idle"] = Animation(idle_frames, speed=10)
+            self.states["idle"] = Animation(idle_frames, speed=10, boxes=load_boxes(os.path.join(base_path, "idle")))
         
         # Load run animation
         run_frames = self.load_frames_from_folder(os.path.join(base_path, "run"))
         if run_frames:
-            self.states["run"] = Animation(run_frames, speed=5) 
+            self.states["run"] = Animation(run_frames, speed=5, boxes=load_boxes(os.path.join(base_path, "run"))) 
         
         # Load jump animation
         jump_frames = self.load_frames_from_folder(os.path.join(base_path, "jump"))
         if jump_frames:
-            self.states["jump"] = Animation(jump_frames, speed=10, loop=False)
+            self.states["jump"] = Animation(jump_frames, speed=10, loop=False, boxes=load_boxes(os.path.join(base_path, "jump")))
         
         # Load attack animation
         attack_frames = self.load_frames_from_folder(os.path.join(base_path, "attack"))
         if attack_frames:
-            self.states["attack"] = Animation(attack_frames, speed=5, loop=False)
+            self.states["attack"] = Animation(attack_frames, speed=5, loop=False, boxes=load_boxes(os.path.join(base_path, "attack")))
         
         # Set default state
         self.current_animation = self.states.get("idle", None)
+        for state, animation in self.states.items():
+            animation.track(os.path.join(base_path, state))
+        if self.states:
+            print(memory_report(base_path, self.states))
     
     def load_frames_from_folder(self, folder_path):
         #Load all PNG images from a folder and return as list of surfaces
@@ -91,17 +118,31 @@ class Player:
             self.current_animation = self.states[new_state]
             self.current_animation.reset()
     
+    def can_jump(self):
+        return not self.is_jumping
+    
+    def can_attack(self):
+        return self.attack_cooldown <= 0 and "attack" in self.states
+    
+    def can_teleport(self):
+        return self.teleport_cooldown <= 0 and not self.is_teleporting
+    
     def jump(self):
         if not self.is_jumping:
             self.velocity_y = self.jump_power
             self.is_jumping = True
             self.set_state("jump")
+            if self.telemetry:
+                self.telemetry.record(JUMP, PLAYER, self.rect.centerx)
     
     def teleport(self):
         # Teleport player in the direction theyre facing
         if self.teleport_cooldown <= 0 and not self.is_teleporting:
             self.is_teleporting = True
             self.teleport_timer = self.teleport_duration
+            self.timers.schedule(self.teleport_duration, self.end_teleport)
+            if self.effects:
+                self.effects.teleport_burst(*self.rect.center)
             
             # Calculate teleport position
             if self.facing_right:
@@ -112,71 +153,93 @@ class Player:
             # Boundary checking
             if new_x < 0:
                 new_x = 0
-            elif new_x + self.rect.width > 1280:  # SCREEN_WIDTH
-                new_x = 1280 - self.rect.width
+            elif new_x + self.rect.width > STAGE_WIDTH:
+                new_x = STAGE_WIDTH - self.rect.width
             
             # Set new position
+            if self.telemetry:
+                self.telemetry.record(TELEPORT, PLAYER, self.rect.x, new_x)
             self.rect.x = new_x
+            if self.effects:
+                self.effects.teleport_burst(*self.rect.center)
             
             # Set cooldown
             self.teleport_cooldown = self.teleport_cooldown_time
     
+    def end_teleport(self):
+        self.is_teleporting = False
+    
+    def capture_state(self):
+        # Plain values only, so keyframes can be pickled; deadlines are absolute ticks
+        state = {name: getattr(self, name) for name in self.state_fields}
+        state["rect"] = tuple(self.rect)
+        state["animation"] = self.current_animation.capture_state() if self.current_animation else None
+        return state
+    
+    def restore_state(self, state):
+        # The timer wheel must already be at the restored tick
+        for name in self.state_fields:
+            setattr(self, name, state[name])
+        self.rect = pygame.Rect(state["rect"])
+        self.current_animation = self.states.get(self.current_state)
+        if self.current_animation and state["animation"]:
+            self.current_animation.restore_state(state["animation"])
+        if self.is_teleporting:
+            self.timers.schedule(self.teleport_timer_deadline - self.timers.now, self.end_teleport)
+    
+    def is_regenerating(self):
+        return (0 < self.health < self.max_health and not self.regen_paused and
+                self.timers.now - self.last_hit_tick >= self.health_regen_delay)
+    
+    def pause_regen(self):
+        # Bank what has regenerated so far and hold it until health is next written
+        self.health = self.health
+        self.regen_paused = True
+    
+    def teleport_progress(self):
+        # Fraction of the teleport cooldown that has elapsed, None when ready
+        if self.teleport_cooldown <= 0:
+            return None
+        return 1 - (self.teleport_cooldown / self.teleport_cooldown_time)
+    
     def take_damage(self, amount):
+        # Writing health also restarts the regen delay
         self.health -= amount
-        self.health_regen_timer = 0  # Reset regen timer when taking damage
-    
-    def regenerate_health(self):
-        # Only regenerate if not at full health and not recently damaged
-        if self.health < self.max_health and self.health_regen_timer >= self.health_regen_delay:
-            # Regenerate health every 10 frames (6 HP per second)
-            if self.health_regen_timer % 10 == 0:
-                self.health = min(self.max_health, self.health + 1)
-        
-        if self.health < self.max_health:
-            self.health_regen_timer += 1
+        if self.telemetry:
+            self.telemetry.record(DAMAGE, PLAYER, amount, self.health)
     
     def attack(self, enemy):
         if self.attack_cooldown <= 0 and "attack" in self.states:
+            if self.current_state == "attack":
+                # A follow-up before the last swing finished starts over on its active frame
+                self.current_animation.reset()
             self.set_state("attack")
-            attack_range = 50
-            attack_height = 40
+            self.attack_landed = False
+            # Used to be 30, but it was counted down twice per tick
+            self.attack_cooldown = 15
             
-            if self.facing_right:
-                attack_rect = pygame.Rect(
-                    self.rect.right, 
-                    self.rect.centery - attack_height//2, 
-                    attack_range, 
-                    attack_height
-                )
+            # The first frame may already connect
+            self.resolve_attack(enemy)
+    
+    def resolve_attack(self, enemy):
+        # Each attack lands at most once, on the first active frame that touches the target
+        if enemy is None or self.attack_landed or self.current_state != "attack":
+            return
+        
+        contact = attack_hits(self, enemy)
+        if contact:
+            self.attack_landed = True
+            if self.effects:
+                self.effects.hit_sparks(contact.centerx, contact.centery, self.facing_right)
+            if self.telemetry:
+                self.telemetry.record(HIT, PLAYER, 5, contact.centerx, contact.centery)
+            if hasattr(enemy, 'take_damage'):
+                enemy.take_damage(5)
             else:
-                attack_rect = pygame.Rect(
-                    self.rect.left - attack_range, 
-                    self.rect.centery - attack_height//2, 
-                    attack_range, 
-                    attack_height
-                )
-            
-            # Check if attack hits specific enemy
-            if attack_rect.colliderect(enemy.rect):
-                if hasattr(enemy, 'take_damage'):
-                    enemy.take_damage(5)
-                else:
-                    enemy.health -= 5            
-            self.attack_cooldown = 30
+                enemy.health -= 5
     
     def update(self, enemy):
-        # Update cooldowns
-        if self.teleport_cooldown > 0:
-            self.teleport_cooldown -= 1
-        
-        # Update teleport effect
-        if self.is_teleporting:
-            self.teleport_timer -= 1
-            if self.teleport_timer <= 0:
-                self.is_teleporting = False
-        
-        # Health regeneration
-        self.regenerate_health()
+        # Cooldowns, the teleport effect and regen are driven by the timer wheel
         
         # Update animation state based on current conditions
         if not self.is_jumping and self.current_state != "attack" and not self.is_teleporting:
@@ -189,6 +252,9 @@ class Player:
         if self.current_animation:
             self.current_animation.update()
             
+            # Active attack frames are checked every tick against the target
+            self.resolve_attack(enemy)
+            
             # Return to appropriate state after attack animation finishes
             if self.current_state == "attack" and self.current_animation.is_finished():
                 if self.is_jumping:
@@ -210,83 +276,59 @@ class Player:
         self.rect.y += self.velocity_y
         
         # Ground collision
-        if self.rect.bottom >= 720 - 20:  # SCREEN_HEIGHT - ground height
-            self.rect.bottom = 720 - 20
+        if self.rect.bottom >= GROUND_Y:
+            self.rect.bottom = GROUND_Y
             self.velocity_y = 0
+            if self.is_jumping and self.effects:
+                self.effects.dust(self.rect.centerx, self.rect.bottom)
             self.is_jumping = False
-        
-        # Update cooldown
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
     
-    def draw(self, screen):
+    def pose(self):
+        # What drawing needs from this tick, see scene.FighterPose
+        animation = self.current_animation
+        return FighterPose(self, animation, animation.current_frame if animation else 0, self.rect.copy(),
+                           self.facing_right, self.health, self.max_health, self.is_teleporting,
+                           self.teleport_timer, self.teleport_progress(), self.is_regenerating(), None,
+                           self.timers.now)
+    
+    def draw(self, queue, view, pose):
+        # Submits cached sprites to the render queue, positioned in world units through the view.
+        # Everything that moves comes from the pose, so this can run while the next tick simulates.
+        # Health, regen and cooldown indicators are HUD widgets bound to this fighter.
+        sprites = queue.sprites
+        rect = pose.rect
+        z = rect.bottom
+        
         # Only draw if not teleporting 
-        if not self.is_teleporting or (self.is_teleporting and self.teleport_timer % 3 == 0):  # Blink effect
-            if self.current_animation and self.current_animation.get_current_frame():
-                current_frame = self.current_animation.get_current_frame()
-                
-                # Flip the frame if facing left
-                if not self.facing_right:
-                    current_frame = pygame.transform.flip(current_frame, True, False)
-                
-                # Draw the sprite centered on the rectangle
-                sprite_rect = current_frame.get_rect()
-                sprite_rect.center = self.rect.center
-                
-                # Add transparency effect during teleport
-                if self.is_teleporting:
-                    # Create a copy with alpha modulation for teleport effect
-                    teleport_frame = current_frame.copy()
-                    alpha = 128 + (self.teleport_timer * 12)  # Fade in from transparent
-                    teleport_frame.set_alpha(min(255, alpha))
-                    screen.blit(teleport_frame, sprite_rect)
-                else:
-                    screen.blit(current_frame, sprite_rect)
+        if not pose.is_teleporting or (pose.is_teleporting and pose.teleport_timer % 3 == 0):  # Blink effect
+            animation = pose.animation
+            if animation and animation.get_frame(pose.frame):
+                center = view.point(*rect.center)
+                # One sprite per cached zoom level in use, two while blending between levels
+                for current_frame, scale, alpha in view.sprite_levels(animation.get_frame(pose.frame)):
+                    # Flip the frame if facing left
+                    if not pose.facing_right:
+                        current_frame = sprites.flipped(current_frame)
+                    
+                    # Trimmed frame placed where the centred full frame would be
+                    sprite_rect = current_frame.get_rect(topleft=animation.sprite_position(
+                        pose.frame, pose.facing_right, center, scale))
+                    
+                    # Add transparency effect during teleport
+                    if pose.is_teleporting:
+                        fade = min(255, 128 + (pose.teleport_timer * 12))  # Fade in from transparent
+                        alpha = fade if alpha is None else fade * alpha // 255
+                    if alpha is not None:
+                        current_frame = sprites.with_alpha(current_frame, alpha)
+                    queue.submit(FIGHTERS, z, current_frame, sprite_rect)
             else:
                 # Fallback: draw rectangle if no sprites loaded
-                if self.is_teleporting:
-                    s = pygame.Surface((self.rect.width, self.rect.height))
-                    s.set_alpha(128)
-                    s.fill(self.color)
-                    screen.blit(s, self.rect)
-                else:
-                    pygame.draw.rect(screen, self.color, self.rect)
+                body_rect = view.rect(rect)
+                alpha = 128 if pose.is_teleporting else None
+                queue.submit(FIGHTERS, z, sprites.rect(body_rect.size, self.color, alpha), body_rect)
         
         # Draw facing direction indicator
-        if not self.is_teleporting:
-            direction_x = self.rect.centerx + (20 if self.facing_right else -20)
-            pygame.draw.circle(screen, GREEN, (direction_x, self.rect.centery), 5)
-        
-        # Draw health bar
-        health_width = (self.rect.width * self.health) // 100
-        health_color = GREEN if self.health > 50 else RED
-        health_bar = pygame.Rect(self.rect.x, self.rect.y - 25, health_width, 10)
-        pygame.draw.rect(screen, health_color, health_bar)
-        
-        # Draw health bar background
-        health_bg = pygame.Rect(self.rect.x, self.rect.y - 25, self.rect.width, 10)
-        pygame.draw.rect(screen, WHITE, health_bg, 1)
-        
-        # Draw teleport cooldown indicator (blue circle)
-        if self.teleport_cooldown > 0:
-            cooldown_x = self.rect.centerx
-            cooldown_y = self.rect.y - 55
-            # Calculate cooldown progress
-            progress = 1 - (self.teleport_cooldown / self.teleport_cooldown_time)
-            pygame.draw.circle(screen, BLUE, (cooldown_x, cooldown_y), 8)
-            pygame.draw.circle(screen, WHITE, (cooldown_x, cooldown_y), 6)
-            # Draw progress arc
-            if progress > 0:
-                pygame.draw.arc(screen, BLUE, 
-                               (cooldown_x - 6, cooldown_y - 6, 12, 12),
-                               -90, -90 + 360 * progress, 3)
-        
-        # Draw regen indicator (pulsing green circle when regenerating)
-        if (self.health_regen_timer >= self.health_regen_delay and 
-            self.health < self.max_health and 
-            not self.is_teleporting):
-            regen_x = self.rect.centerx
-            regen_y = self.rect.y - 40
-            pulse = (pygame.time.get_ticks() // 200) % 2  # Pulsing effect
-            size = 5 if pulse else 3
-            pygame.draw.circle(screen, GREEN, (regen_x, regen_y), size)
+        if not pose.is_teleporting:
+            direction_x = rect.centerx + (20 if pose.facing_right else -20)
+            dot = sprites.circle(view.length(5), GREEN)
+            queue.submit(INDICATORS, z, dot, dot.get_rect(center=view.point(direction_x, rect.centery)))
@@ -0,0 +1,128 @@
+import pygame
+from collections import OrderedDict
+from asset_memory import memory, surface_bytes
+
+# Draw layers, lowest first
+BACKGROUND = 0
+GROUND = 1
+FIGHTERS = 2
+EFFECTS = 3
+INDICATORS = 4
+HUD = 5
+OVERLAY = 6
+
+SPRITE_CACHE_SIZE = 1024
+
+
+def use_rle(surface):
+    # RLE-accelerated alpha blits skip transparent runs; mostly-empty sprites blit much faster
+    surface.set_alpha(255, pygame.RLEACCEL)
+    return surface
+
+
+def keep_rle(source, surface):
+    # Transforms drop the RLE flag, so derived variants ask for it again
+    if source.get_flags() & (pygame.RLEACCEL | pygame.RLEACCELOK):
+        use_rle(surface)
+    return surface
+
+
+class SpriteCache:
+    # Primitives and effect variants rendered once and reused as plain surfaces
+    def __init__(self, max_entries=SPRITE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.used = {}  # key -> memory.frame it was last drawn in
+        memory.add_evictor("sprite variants", self.evict, self.reclaimable, priority=0)
+
+    def get(self, key, build):
+        surface = self.entries.get(key)
+        if surface is None:
+            surface = build()
+            self.entries[key] = surface
+            self.used[key] = memory.frame
+            memory.track(surface, key[0], "sprite variant")
+            if len(self.entries) > self.max_entries:
+                del self.used[self.entries.popitem(last=False)[0]]
+        else:
+            self.entries.move_to_end(key)
+            self.used[key] = memory.frame
+        return surface
+
+    def evict(self, size):
+        # Least recently used first, never anything drawn this frame; dropped entries are
+        # rebuilt on their next use
+        freed = 0
+        while self.entries and freed < size:
+            key = next(iter(self.entries))
+            if self.used[key] == memory.frame:
+                break
+            del self.used[key]
+            freed += surface_bytes(self.entries.pop(key))
+
+    def reclaimable(self):
+        frame = memory.frame
+        return sum(surface_bytes(surface) for key, surface in self.entries.items() if self.used[key] != frame)
+
+    def rect(self, size, color, alpha=None):
+        def build():
+            surface = pygame.Surface(size).convert()
+            surface.fill(color)
+            if alpha is not None:
+                surface.set_alpha(alpha)
+            return surface
+        return self.get(("rect", size, color, alpha), build)
+
+    def outline(self, size, color, width):
+        def build():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, color, surface.get_rect(), width)
+            return surface
+        return self.get(("outline", size, color, width), build)
+
+    def circle(self, radius, color):
+        def build():
+            surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            return surface
+        return self.get(("circle", radius, color), build)
+
+    def flipped(self, surface):
+        return self.get(("flip", surface), lambda: keep_rle(surface, pygame.transform.flip(surface, True, False)))
+
+    def with_alpha(self, surface, alpha):
+        def build():
+            variant = surface.copy()
+            variant.set_alpha(alpha)
+            return variant
+        return self.get(("alpha", surface, alpha), build)
+
+
+class RenderQueue:
+    # Collects draw calls for a frame, then sorts them once and flushes with Surface.blits
+    def __init__(self):
+        self.items = []
+        self.sprites = SpriteCache()
+
+    def submit(self, layer, z, surface, dest, area=None, special_flags=0):
+        self.items.append((layer, z, len(self.items), (surface, dest, area, special_flags), None))
+
+    def submit_batch(self, layer, z, blit_sequence):
+        # Pre-built (surface, dest) pairs, e.g. particles, kept together in one blits call
+        self.items.append((layer, z, len(self.items), None, blit_sequence))
+
+    def flush(self, target):
+        # Sorting by (layer, z, submission order) keeps same-z draws stable
+        self.items.sort(key=lambda item: item[:3])
+        pending = []
+        for layer, z, order, blit, batch in self.items:
+            if batch is None:
+                pending.append(blit)
+            else:
+                if pending:
+                    target.blits(pending, doreturn=False)
+                    pending = []
+                target.blits(batch, doreturn=False)
+        if pending:
+            target.blits(pending, doreturn=False)
+        self.items.clear()
@@ -0,0 +1,188 @@
+import math
+from collections import OrderedDict
+import pygame
+from settings import WORLD_WIDTH, WORLD_HEIGHT, SCALE_MODE, ZOOM_FILTER, ZOOM_CACHE_MB
+from render_queue import keep_rle
+from asset_memory import memory, surface_bytes
+
+LEVELS_PER_OCTAVE = 4  # cached zoom levels are 2 ** (n / 4): 1, 1.19, 1.41, 1.68, ...
+BLEND_STEPS = 8  # opacities the upper level fades in with when blending
+CULL_MARGIN = 200  # world units; sprites and effects reach this far past a fighter's rect
+
+
+class ZoomCache:
+    # Sprite frames pre-scaled to a few zoom levels, like mipmaps. A level is scaled from
+    # the source frame the first time it is drawn, and the least recently drawn levels
+    # are dropped once the cache holds more than `max_bytes` of pixels.
+    def __init__(self, max_bytes=ZOOM_CACHE_MB << 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (source, level) -> scaled surface
+        self.used = {}  # (source, level) -> memory.frame it was last drawn in
+        self.bytes = 0
+        self.built = 0
+        memory.add_evictor("zoom levels", self.evict, self.reclaimable, priority=1)
+
+    @staticmethod
+    def level_zoom(level):
+        return 2 ** (level / LEVELS_PER_OCTAVE)
+
+    def get(self, surface, level, scale):
+        key = (surface, level)
+        scaled = self.entries.get(key)
+        if scaled is not None:
+            self.entries.move_to_end(key)
+            self.used[key] = memory.frame
+            return scaled
+        scale *= self.level_zoom(level)
+        if scale == 1:
+            return surface
+        size = (max(1, round(surface.get_width() * scale)), max(1, round(surface.get_height() * scale)))
+        scaled = keep_rle(surface, pygame.transform.smoothscale(surface, size))
+        self.entries[key] = scaled
+        self.used[key] = memory.frame
+        self.bytes += surface_bytes(scaled)
+        self.built += 1
+        memory.track(scaled, "zoom cache", "zoom level")
+        self.evict(self.bytes - self.max_bytes, keep=1)
+        return scaled
+
+    def evict(self, size, keep=0):
+        # Least recently drawn levels first, never one drawn this frame
+        freed = 0
+        while freed < size and len(self.entries) > keep:
+            key = next(iter(self.entries))
+            if self.used[key] == memory.frame:
+                break
+            del self.used[key]
+            freed += surface_bytes(self.entries.pop(key))
+        self.bytes -= freed
+
+    def reclaimable(self):
+        frame = memory.frame
+        return sum(surface_bytes(scaled) for key, scaled in self.entries.items() if self.used[key] != frame)
+
+    def forget(self, surface):
+        # Every level of a frame that was replaced
+        for key in [key for key in self.entries if key[0] is surface]:
+            del self.used[key]
+            self.bytes -= surface_bytes(self.entries.pop(key))
+
+
+class View:
+    # Maps world coordinates onto a render surface of any size. `scale` fits the world
+    # to the surface; the camera's `zoom` magnifies the world on top of it, while HUD
+    # sizes (`length`, `screen_point`) stay at the plain scale.
+    def __init__(self, surface_size, world_size=(WORLD_WIDTH, WORLD_HEIGHT), zoom_filter=ZOOM_FILTER):
+        self.width, self.height = surface_size
+        self.scale = min(self.width / world_size[0], self.height / world_size[1])
+        self.zoom = 1.0
+        self.offset_x = 0
+        self.offset_y = 0
+        self.zoom_filter = zoom_filter
+        self.zoomed_sprites = ZoomCache()
+
+    def look(self, frame):
+        # Point the view where a camera frame says, see Camera.frame
+        self.offset_x, self.offset_y, self.zoom = frame
+
+    @property
+    def world_scale(self):
+        return self.scale * self.zoom
+
+    def point(self, x, y):
+        # World position to surface position
+        scale = self.world_scale
+        return (round((x - self.offset_x) * scale),
+                round((y - self.offset_y) * scale))
+
+    def visible(self, rect, margin=CULL_MARGIN):
+        # Whether a world rect, grown by `margin`, reaches into the view horizontally
+        width = self.width / self.world_scale
+        return rect.right + margin > self.offset_x and rect.left - margin < self.offset_x + width
+
+    def rect(self, rect):
+        x, y = self.point(rect.x, rect.y)
+        scale = self.world_scale
+        return pygame.Rect(x, y, round(rect.width * scale), round(rect.height * scale))
+
+    def length(self, value):
+        # Sizes never collapse to nothing, so thin outlines stay visible
+        return max(1, round(value * self.scale))
+
+    def screen_point(self, x, y):
+        # HUD layout is authored for a 1280x720 screen and ignores the world offset
+        return round(x * self.scale), round(y * self.scale)
+
+    def sprite_levels(self, surface):
+        # (sprite, scale it was drawn at, opacity) to draw for a frame at the current zoom.
+        # Sprites come from the zoom cache, so zooming never rescales anything per frame:
+        # "snap" draws the nearest cached level, "blend" fades the next level up in over
+        # the one below as the zoom moves between them.
+        position = math.log2(self.zoom) * LEVELS_PER_OCTAVE
+        cache = self.zoomed_sprites
+        if self.zoom_filter != "blend":
+            level = round(position)
+            return ((cache.get(surface, level, self.scale), self.scale * cache.level_zoom(level), None),)
+        lower = math.floor(position)
+        levels = [(cache.get(surface, lower, self.scale), self.scale * cache.level_zoom(lower), None)]
+        step = round((position - lower) * BLEND_STEPS)
+        if step == BLEND_STEPS:
+            return ((cache.get(surface, lower + 1, self.scale), self.scale * cache.level_zoom(lower + 1), None),)
+        if step:
+            levels.append((cache.get(surface, lower + 1, self.scale), self.scale * cache.level_zoom(lower + 1),
+                           255 * step // BLEND_STEPS))
+        return levels
+
+    def forget_sprite(self, surface):
+        self.zoomed_sprites.forget(surface)
+
+
+class RenderTarget:
+    # Offscreen surface at the internal resolution, scaled to the window in one pass
+    def __init__(self, window_size, render_size, scale_mode=SCALE_MODE, vsync=False):
+        self.scale_mode = scale_mode
+        self.vsync = vsync and self.open_vsync_window(render_size)
+        if not self.vsync:
+            self.window = pygame.display.set_mode(window_size)
+
+        if self.vsync or tuple(render_size) == tuple(window_size):
+            # Nothing to scale, draw straight into the window
+            self.surface = self.window
+            self.dest_rect = self.window.get_rect()
+        else:
+            self.surface = memory.track(pygame.Surface(render_size).convert(), "render target", "screen")
+            self.dest_rect = self.fit_rect(window_size, render_size)
+            # Letterbox bars are drawn once, presenting only touches dest_rect
+            self.window.fill((0, 0, 0))
+
+        self.dest = self.window.subsurface(self.dest_rect)
+        self.view = View(render_size)
+
+    def open_vsync_window(self, render_size):
+        # SDL only syncs to the display with SCALED or OPENGL windows; with SCALED the
+        # render size is the logical size and SDL does the upscale on the GPU
+        try:
+            self.window = pygame.display.set_mode(render_size, pygame.SCALED, vsync=1)
+            return True
+        except pygame.error as e:
+            print(f"Vsync not available, falling back to timed pacing: {e}")
+            return False
+
+    def fit_rect(self, window_size, render_size):
+        # Largest rect with the render aspect ratio that fits the window
+        factor = min(window_size[0] / render_size[0], window_size[1] / render_size[1])
+        if self.scale_mode == "integer" and factor >= 1:
+            factor = int(factor)
+        width = round(render_size[0] * factor)
+        height = round(render_size[1] * factor)
+        rect = pygame.Rect(0, 0, width, height)
+        rect.center = (window_size[0] // 2, window_size[1] // 2)
+        return rect
+
+    def present(self):
+        if self.surface is not self.window:
+            if self.scale_mode == "smooth":
+                pygame.transform.smoothscale(self.surface, self.dest_rect.size, self.dest)
+            else:
+                pygame.transform.scale(self.surface, self.dest_rect.size, self.dest)
+        pygame.display.flip()
@@ -0,0 +1,155 @@
+import argparse
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from replay import Replay, play_frame
+from settings import FPS, parse_size
+
+# Raw byte order of a 32-bit surface, keyed by its RGB masks, as ffmpeg pixel formats
+PIXEL_FORMATS = {
+    (0xFF0000, 0x00FF00, 0x0000FF): "bgr0",
+    (0x0000FF, 0x00FF00, 0xFF0000): "rgb0",
+}
+
+
+def pixel_format(surface):
+    return PIXEL_FORMATS.get(tuple(surface.get_masks()[:3]))
+
+
+class FrameWriter:
+    # Writes rendered frames straight from the surface's pixel buffer, or as numbered PNGs
+    def __init__(self, surface, out_dir, segment, fmt):
+        self.surface = surface
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.frames = 0
+        self.file = None
+        if fmt == "raw":
+            width = surface.get_width()
+            if surface.get_bytesize() != 4 or surface.get_pitch() != width * 4 or not pixel_format(surface):
+                raise ValueError("Raw export needs a packed 32-bit render surface")
+            self.path = os.path.join(out_dir, f"segment-{segment:04d}.raw")
+            self.file = open(self.path, "wb")
+        else:
+            self.path = out_dir
+
+    def write(self, frame_number):
+        if self.file:
+            # get_view("0") exposes the pixel memory itself; the file reads it without a copy
+            view = self.surface.get_view("0")
+            self.file.write(view)
+            del view  # releases the surface lock
+        else:
+            import pygame
+            pygame.image.save(self.surface, os.path.join(self.out_dir, f"frame-{frame_number:07d}.png"))
+        self.frames += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+def render_segment(replay_path, segment, start, end, first_frame, size, out_dir, fmt):
+    # Runs in a worker process: restore the keyframe, re-simulate and draw every tick offscreen
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from main import Game
+
+    replay = Replay.load(replay_path)
+    game = Game(render_size=size, window_size=size, seed=replay.seed)
+    game.restore_state(replay.keyframes[start])
+    writer = FrameWriter(game.screen, out_dir, segment, fmt)
+
+    def on_tick():
+        game.render_scene()
+        writer.write(first_frame + writer.frames)
+
+    for index in range(start, end):
+        play_frame(game, replay.frames[index], on_tick)
+    writer.close()
+    return segment, writer.frames, writer.path
+
+
+def stitch(results, out_dir, pix_fmt, size, encode):
+    # Segments are concatenated in order, into an encoder if there is one
+    results = sorted(results)
+    paths = [path for _, _, path in results]
+    encoder = shutil.which("ffmpeg") if encode else None
+    if encoder:
+        output = os.path.join(out_dir, "match.mp4")
+        command = [encoder, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", pix_fmt,
+                   "-s", f"{size[0]}x{size[1]}", "-r", str(FPS), "-i", "-",
+                   "-c:v", "libx264", "-pix_fmt", "yuv420p", output]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        target = process.stdin
+    else:
+        if encode:
+            print("ffmpeg not found, writing raw video instead")
+        output = os.path.join(out_dir, "match.raw")
+        target = open(output, "wb")
+
+    with target:
+        for path in paths:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, target, 1 << 20)
+            os.remove(path)
+    if encoder and process.wait() != 0:
+        raise RuntimeError("ffmpeg failed")
+    if not encoder:
+        print(f"Encode with: ffmpeg -f rawvideo -pix_fmt {pix_fmt} -s {size[0]}x{size[1]} "
+              f"-r {FPS} -i {output} match.mp4")
+    return output
+
+
+def probe_pixel_format(size):
+    # The dummy display decides the surface layout; workers create the same one
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    import pygame
+    pygame.display.init()
+    surface = pygame.display.set_mode(size)
+    pix_fmt = pixel_format(surface)
+    pygame.display.quit()
+    return pix_fmt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded match offline, faster than real time")
+    parser.add_argument("replay")
+    parser.add_argument("--out", default="render")
+    parser.add_argument("--size", default="1280x720", help="output resolution, e.g. 640x360")
+    parser.add_argument("--format", choices=("raw", "png"), default="raw")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--encode", action="store_true", help="pipe the stitched raw video into ffmpeg")
+    args = parser.parse_args()
+
+    size = parse_size(args.size, (1280, 720))
+    os.makedirs(args.out, exist_ok=True)
+    replay = Replay.load(args.replay)
+
+    # Each segment starts on a keyframe and knows the number of its first output frame
+    jobs = []
+    first_frame = 0
+    for segment, (start, end) in enumerate(replay.segments()):
+        jobs.append((args.replay, segment, start, end, first_frame, size, args.out, args.format))
+        first_frame += replay.tick_count(start, end)
+
+    started = time.perf_counter()
+    # Spawned workers start without any SDL state inherited from this process
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn")) as pool:
+        results = list(pool.map(render_segment, *zip(*jobs)))
+    elapsed = time.perf_counter() - started
+
+    frames = sum(count for _, count, _ in results)
+    print(f"Rendered {frames} frames in {len(jobs)} segments on {args.workers} workers, "
+          f"{elapsed:.1f} s ({frames / FPS / max(elapsed, 1e-9):.1f}x real time)")
+    if args.format == "raw":
+        output = stitch(results, args.out, probe_pixel_format(size), size, args.encode)
+        print(f"Video written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+import base64
+import bisect
+import json
+import sys
+import time
+import zlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+REPLAY_VERSION = 4
+KEYFRAME_INTERVAL = 30  # ticks between keyframes, the most a seek ever re-simulates
+FULL_KEYFRAME_EVERY = 20  # keyframes; the ones in between are stored as deltas
+SEGMENT_TICKS = 600  # smallest span handed to one offline render worker
+
+# Edit kinds used by the keyframe deltas
+SET = 0
+PATCH_DICT = 1
+PATCH_SEQ = 2
+
+
+def same(old, new):
+    if np is not None and isinstance(new, np.ndarray):
+        return isinstance(old, np.ndarray) and old.dtype == new.dtype and np.array_equal(old, new)
+    return type(old) is type(new) and old == new
+
+
+def diff(old, new):
+    # Smallest edit that turns `old` into `new`, or None when they are equal.
+    # Dicts and same-length sequences are patched per entry, anything else is replaced.
+    if isinstance(new, dict) and isinstance(old, dict):
+        edits = {}
+        for key, value in new.items():
+            if key not in old:
+                edits[key] = (SET, value)
+            else:
+                edit = diff(old[key], value)
+                if edit is not None:
+                    edits[key] = edit
+        removed = [key for key in old if key not in new]
+        return (PATCH_DICT, edits, removed) if edits or removed else None
+    if isinstance(new, (list, tuple)) and type(old) is type(new) and len(old) == len(new):
+        edits = {}
+        for index, (a, b) in enumerate(zip(old, new)):
+            edit = diff(a, b)
+            if edit is not None:
+                edits[index] = edit
+        return (PATCH_SEQ, edits) if edits else None
+    return None if same(old, new) else (SET, new)
+
+
+def encode(value):
+    # Game state as plain JSON. Tuples, dicts and arrays are tagged so they come back as
+    # the same types; loading a replay only ever builds data, never runs code from it.
+    if isinstance(value, tuple):
+        return {"t": [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {"d": [[encode(key), encode(item)] for key, item in value.items()]}
+    if np is not None and isinstance(value, np.ndarray):
+        return {"a": [value.dtype.str, list(value.shape), base64.b64encode(value.tobytes()).decode("ascii")]}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Cannot store {type(value).__name__} in a replay")
+
+
+def decode(value):
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "t" in value:
+        return tuple(decode(item) for item in value["t"])
+    if "d" in value:
+        return {decode(key): decode(item) for key, item in value["d"]}
+    dtype, shape, data = value["a"]
+    if np is None:
+        raise RuntimeError("This replay stores arrays and needs NumPy")
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "biuf":
+        raise ValueError(f"Unsupported array type in replay: {dtype}")
+    return np.frombuffer(base64.b64decode(data), dtype).reshape(shape).copy()
+
+
+def patch(old, edit):
+    # Apply an edit from diff(); `old` is left untouched
+    kind = edit[0]
+    if kind == SET:
+        return edit[1]
+    if kind == PATCH_DICT:
+        new = dict(old)
+        for key, sub_edit in edit[1].items():
+            new[key] = patch(old.get(key), sub_edit)
+        for key in edit[2]:
+            del new[key]
+        return new
+    items = list(old)
+    for index, sub_edit in edit[1].items():
+        items[index] = patch(old[index], sub_edit)
+    return type(old)(items)
+
+
+class Replay:
+    # One match as the inputs of every loop frame, plus a full-state keyframe every
+    # KEYFRAME_INTERVAL ticks. A frame is (pressed, just_pressed, updates): the controls
+    # polled that frame and how many simulation ticks ran on them. Keyframes are taken at
+    # the start of a frame and indexed by tick, so any tick is a restore plus a short re-sim.
+    def __init__(self, seed, frames=None, keyframes=None, keyframe_ticks=None):
+        self.seed = seed
+        self.frames = frames if frames is not None else []
+        self.keyframes = keyframes if keyframes is not None else {}  # frame index -> state
+        self.keyframe_ticks = keyframe_ticks if keyframe_ticks is not None else {}  # frame index -> tick
+        self.build_index()
+
+    def build_index(self):
+        # Sorted ticks for bisecting, with the frame each keyframe belongs to
+        self.index = sorted((tick, frame) for frame, tick in self.keyframe_ticks.items())
+        self.index_ticks = [tick for tick, _ in self.index]
+
+    def save(self, path):
+        # Inputs are packed two bytes per frame and update counts four, since a long
+        # stall is caught up in one frame; keyframes are full every
+        # FULL_KEYFRAME_EVERY entries and deltas against the previous one otherwise
+        inputs = array("B")
+        updates = array("I")
+        for pressed, just_pressed, count in self.frames:
+            inputs.extend((pressed, just_pressed))
+            updates.append(count)
+        if sys.byteorder == "big":
+            updates.byteswap()
+        keyframes = []
+        previous = None
+        for count, (tick, frame) in enumerate(self.index):
+            state = self.keyframes[frame]
+            if count % FULL_KEYFRAME_EVERY == 0:
+                keyframes.append((frame, tick, SET, state))
+            else:
+                keyframes.append((frame, tick, PATCH_DICT, diff(previous, state)))
+            previous = state
+        data = {"version": REPLAY_VERSION, "seed": self.seed,
+                "inputs": base64.b64encode(inputs.tobytes()).decode("ascii"),
+                "updates": base64.b64encode(updates.tobytes()).decode("ascii"),
+                "keyframes": encode(keyframes)}
+        with open(path, "wb") as f:
+            f.write(zlib.compress(json.dumps(data, separators=(",", ":")).encode()))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            try:
+                data = json.loads(zlib.decompress(f.read()))
+            except (zlib.error, ValueError):
+                raise ValueError(f"Not a replay file, or one from an older version: {path}") from None
+        if not isinstance(data, dict) or data.get("version") != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version: {data.get('version') if isinstance(data, dict) else None}")
+
+        inputs = base64.b64decode(data["inputs"])
+        updates = array("I", base64.b64decode(data["updates"]))
+        if sys.byteorder == "big":
+            updates.byteswap()
+        if len(inputs) != 2 * len(updates):
+            raise ValueError(f"Corrupt replay, {len(inputs)} input bytes for {len(updates)} frames: {path}")
+        frames = [(inputs[2 * i], inputs[2 * i + 1], count) for i, count in enumerate(updates)]
+        # Deltas are resolved once here, so seeking never walks a chain
+        keyframes = {}
+        keyframe_ticks = {}
+        state = None
+        for frame, tick, kind, payload in decode(data["keyframes"]):
+            state = payload if kind == SET else patch(state, payload)
+            keyframes[frame] = state
+            keyframe_ticks[frame] = tick
+        return cls(data["seed"], frames, keyframes, keyframe_ticks)
+
+    def nearest_keyframe(self, tick):
+        # (tick, frame) of the last keyframe at or before `tick`
+        position = bisect.bisect_right(self.index_ticks, tick) - 1
+        return self.index[max(0, position)]
+
+    def segments(self, min_ticks=SEGMENT_TICKS):
+        # Frame ranges starting on keyframes at least `min_ticks` apart, in order
+        starts = []
+        last_tick = None
+        for tick, frame in self.index:
+            if last_tick is None or tick - last_tick >= min_ticks:
+                starts.append(frame)
+                last_tick = tick
+        ends = starts[1:] + [len(self.frames)]
+        return [(start, end) for start, end in zip(starts, ends) if start < end]
+
+    def tick_count(self, start=0, end=None):
+        return sum(frame[2] for frame in self.frames[start:end])
+
+
+class ReplayRecorder:
+    # Records the live game loop; Game.run calls keyframe() before polling and record() after updating
+    def __init__(self, path, seed, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.replay = Replay(seed)
+        self.keyframe_interval = keyframe_interval
+        self.ticks = 0
+        self.last_keyframe = None
+        self.finished = False
+
+    def keyframe(self, game):
+        # Capturing is cheap; encoding the deltas waits until the replay is saved
+        if self.finished:
+            return
+        if self.last_keyframe is None or self.ticks - self.last_keyframe >= self.keyframe_interval:
+            frame = len(self.replay.frames)
+            self.replay.keyframes[frame] = game.capture_state()
+            self.replay.keyframe_ticks[frame] = self.ticks
+            self.last_keyframe = self.ticks
+
+    def record(self, snapshot, updates):
+        if not self.finished:
+            self.replay.frames.append((snapshot.pressed, snapshot.just_pressed, updates))
+            self.ticks += updates
+
+    def finish(self):
+        # Called once the match is decided; nothing after game over is recorded
+        if not self.finished:
+            self.finished = True
+            self.replay.build_index()
+            self.replay.save(self.path)
+            print(f"Replay saved to {self.path}: {len(self.replay.frames)} frames, "
+                  f"{self.ticks} ticks, {len(self.replay.keyframes)} keyframes")
+
+
+def play_frame(game, frame, on_tick=None):
+    # Run one recorded loop frame: the same input, then the same number of ticks
+    pressed, just_pressed, updates = frame
+    game.apply_system_input(game.input.feed(pressed, just_pressed))
+    for _ in range(updates):
+        game.update()
+        if on_tick:
+            on_tick()
+
+
+class ReplayPlayer:
+    # Plays a replay tick by tick and seeks to any tick by restoring the nearest keyframe
+    def __init__(self, game, replay):
+        self.game = game
+        self.replay = replay
+        self.seek(0)
+
+    def seek(self, tick):
+        keyframe_tick, frame = self.replay.nearest_keyframe(tick)
+        self.game.restore_state(self.replay.keyframes[frame])
+        self.frame = frame
+        self.done_in_frame = 0  # ticks of the current frame already simulated
+        self.tick = keyframe_tick
+        while self.tick < tick and self.step():
+            pass
+
+    def step(self):
+        # Advance one tick; False at the end of the replay
+        frames = self.replay.frames
+        while self.frame < len(frames) and self.done_in_frame == frames[self.frame][2]:
+            # Frames without ticks still poll input
+            self.next_frame()
+        if self.frame >= len(frames):
+            return False
+        if self.done_in_frame == 0:
+            pressed, just_pressed, _ = frames[self.frame]
+            self.game.apply_system_input(self.game.input.feed(pressed, just_pressed))
+        self.game.update()
+        self.done_in_frame += 1
+        self.tick += 1
+        if self.done_in_frame == frames[self.frame][2]:
+            self.next_frame()
+        return True
+
+    def next_frame(self):
+        if self.done_in_frame == 0:
+            pressed, just_pressed, _ = self.replay.frames[self.frame]
+            self.game.apply_system_input(self.game.input.feed(pressed, just_pressed))
+        self.frame += 1
+        self.done_in_frame = 0
+
+
+def seek_benchmark(path, seeks=200):
+    # Mean time to land on random ticks of a replay, run against the dummy display
+    import os
+    import random
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game
+
+    started = time.perf_counter()
+    replay = Replay.load(path)
+    loaded = time.perf_counter() - started
+    total = replay.tick_count()
+    game = Game(seed=replay.seed)
+    player = ReplayPlayer(game, replay)
+    targets = [random.randrange(total) for _ in range(seeks)]
+    started = time.perf_counter()
+    for tick in targets:
+        player.seek(tick)
+    elapsed = (time.perf_counter() - started) / seeks
+    print(f"{len(replay.frames)} frames, {total} ticks, {len(replay.keyframes)} keyframes, "
+          f"loaded in {loaded * 1000:.0f} ms, mean seek {elapsed * 1000:.2f} ms")
+
+
+def round_trip_check(ticks=1500, stall_updates=300):
+    # Records a scripted match with a catch-up frame longer than a byte, then checks that
+    # the delta codec, the saved file, the keyframe index and step-by-step playback all
+    # give back exactly what was recorded. Run with --check against the dummy display.
+    import os
+    import random
+    import tempfile
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game
+
+    old = {"a": (1, 2.5, None), "b": [1, 2, 3], 4: {"x": "y"}, "gone": True}
+    new = {"a": (1, 3.5, None), "b": [1, 2], 4: {"x": "z", 5: (6,)}, "new": False}
+    if np is not None:
+        old["arrays"] = (np.zeros(3, np.float32), np.arange(4, dtype=np.int32))
+        new["arrays"] = (np.ones(3, np.float32), np.arange(4, dtype=np.int32))
+    assert diff(new, new) is None
+    assert diff(old, {**old, "b": [1, 2, 3]}) is None
+    assert not diff(new, decode(encode(patch(old, decode(encode(diff(old, new)))))))
+
+    game = Game(seed=7)
+    path = os.path.join(tempfile.mkdtemp(), "check.replay")
+    recorder = ReplayRecorder(path, game.seed)
+    script = random.Random(1)
+    states = {}
+    while recorder.ticks < ticks:
+        recorder.keyframe(game)
+        pressed = script.choice((0, 1, 2, 8, 16))
+        snapshot = game.input.feed(pressed, script.choice((0, pressed, 4)))
+        game.apply_system_input(snapshot)
+        updates = stall_updates if len(recorder.replay.frames) == 100 else script.choice((0, 1, 1, 1, 2))
+        for done in range(1, updates + 1):
+            game.update()
+            states[recorder.ticks + done] = game.capture_state()
+        recorder.record(snapshot, updates)
+    recorder.finish()
+
+    replay = Replay.load(path)
+    os.remove(path)
+    original = recorder.replay
+    assert replay.seed == original.seed and replay.frames == original.frames
+    assert replay.keyframe_ticks == original.keyframe_ticks
+    for frame, state in original.keyframes.items():
+        assert not diff(state, replay.keyframes[frame]), f"keyframe {frame} changed on disk"
+    for tick in (0, 1, 29, 30, 31, 1000, recorder.ticks):
+        keyframe_tick, frame = replay.nearest_keyframe(tick)
+        assert keyframe_tick <= tick and replay.keyframe_ticks[frame] == keyframe_tick
+        assert not any(keyframe_tick < other <= tick for other in replay.index_ticks)
+
+    player = ReplayPlayer(Game(seed=replay.seed), replay)
+    while player.step():
+        assert not diff(states[player.tick], player.game.capture_state()), f"playback differs at tick {player.tick}"
+    assert player.tick == recorder.ticks
+    player.seek(1000)
+    assert not diff(states[1000], player.game.capture_state()), "seek differs"
+    print(f"Replay round trip OK: {len(replay.frames)} frames, {replay.tick_count()} ticks, "
+          f"{len(replay.keyframes)} keyframes")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--check"]:
+        round_trip_check()
+    else:
+        seek_benchmark(sys.argv[1])
@@ -0,0 +1,26 @@
+from collections import namedtuple
+
+# Everything drawing reads, captured once per tick. Snapshots are never modified after
+# they are built, so a frame can be drawn from one while the simulation moves on.
+
+
+class FighterPose(namedtuple("FighterPose", "fighter animation frame rect facing_right health max_health "
+                                            "is_teleporting teleport_timer teleport_progress regenerating "
+                                            "aggression_level tick")):
+    # One fighter for one tick. `fighter` and `animation` are only used for what does not
+    # change while playing (colour, loaded frames); `rect` is a private copy.
+    __slots__ = ()
+
+
+class ParticleFrame(namedtuple("ParticleFrame", "pos life max_life color")):
+    # The live range of the particle arrays, copied when the simulation runs on another thread
+    __slots__ = ()
+
+
+class Scene(namedtuple("Scene", "tick player enemies particles camera current_round max_rounds "
+                                "player_wins enemy_wins round_over game_over paused transition_ticks "
+                                "input_tick")):
+    __slots__ = ()
+
+    def poses(self):
+        return (self.player,) + self.enemies
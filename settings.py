@@ -0,0 +1,77 @@
+import os
+
+# Gameplay happens in world units, which never depend on the window or render size
+WORLD_WIDTH = 1280
+WORLD_HEIGHT = 720
+GROUND_HEIGHT = 20  # fighters stand this far above the bottom of the world
+GROUND_Y = WORLD_HEIGHT - GROUND_HEIGHT
+
+# The stage can be wider than the world shown on screen; the camera scrolls across it
+STAGE_WIDTH = max(WORLD_WIDTH, int(os.environ.get("FIGHTER_STAGE_WIDTH", WORLD_WIDTH)))
+STAGE_LEFT = (STAGE_WIDTH - WORLD_WIDTH) // 2  # where the screen starts at the beginning of a round
+
+FPS = 60
+
+
+def parse_size(value, default):
+    # Turn "640x360" into (640, 360), falling back to the default on bad input
+    if not value:
+        return default
+    try:
+        width, height = value.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        print(f"Ignoring invalid size: {value}")
+        return default
+
+
+# Internal render target, e.g. FIGHTER_RENDER_SIZE=640x360 renders a quarter of the pixels
+RENDER_SIZE = parse_size(os.environ.get("FIGHTER_RENDER_SIZE"), (WORLD_WIDTH, WORLD_HEIGHT))
+
+# Window the render target is scaled up to once per frame
+WINDOW_SIZE = parse_size(os.environ.get("FIGHTER_WINDOW_SIZE"), (1280, 720))
+
+# "integer" keeps pixels sharp when the window is a whole multiple, "smooth" filters
+SCALE_MODE = os.environ.get("FIGHTER_SCALE_MODE", "integer")
+
+# Frame pacing while playing: "sleep" (clock.tick), "busy" (tick_busy_loop) or "vsync"
+FRAME_PACING = os.environ.get("FIGHTER_PACING", "sleep")
+
+# Redraw rate on screens where nothing moves (pause, game over, quiet round transitions)
+IDLE_FPS = 10
+
+# Match telemetry: "" (off), "jsonl" or "binary", written off-thread into TELEMETRY_DIR
+TELEMETRY = os.environ.get("FIGHTER_TELEMETRY", "")
+TELEMETRY_DIR = os.environ.get("FIGHTER_TELEMETRY_DIR", "telemetry")
+
+# Record the first match of the session to this replay file, e.g. FIGHTER_RECORD=match.replay
+RECORD_REPLAY = os.environ.get("FIGHTER_RECORD", "")
+
+# Development mode: FIGHTER_HOT_RELOAD=1 reloads changed sprites and backgrounds while playing
+HOT_RELOAD = os.environ.get("FIGHTER_HOT_RELOAD") == "1"
+
+# Mixer format; a small buffer keeps effects close to the action (FIGHTER_AUDIO_BUFFER=256 for less)
+AUDIO_FREQUENCY = 44100
+AUDIO_CHANNELS = 2
+AUDIO_BUFFER = int(os.environ.get("FIGHTER_AUDIO_BUFFER", "512"))
+
+# FIGHTER_CAMERA_ZOOM=0 keeps the camera at 1x instead of zooming in on close exchanges and finishing hits
+CAMERA_ZOOM = os.environ.get("FIGHTER_CAMERA_ZOOM", "1") == "1"
+
+# Camera zoom draws sprites from cached levels: "snap" to the nearest one or "blend" the two around
+# the zoom; FIGHTER_ZOOM_CACHE_MB bounds the pixels those levels may hold
+ZOOM_FILTER = os.environ.get("FIGHTER_ZOOM_FILTER", "snap")
+ZOOM_CACHE_MB = int(os.environ.get("FIGHTER_ZOOM_CACHE_MB", "64"))
+
+# Surfaces over this many MB of pixels make cold caches (effect variants, zoom levels, unused
+# backgrounds) drop entries; FIGHTER_ASSET_BUDGET_MB=0 disables the budget
+ASSET_BUDGET_MB = int(os.environ.get("FIGHTER_ASSET_BUDGET_MB", "512"))
+
+# FIGHTER_MEMORY_OVERLAY=1 shows the live asset memory total on screen
+MEMORY_OVERLAY = os.environ.get("FIGHTER_MEMORY_OVERLAY") == "1"
+
+# FIGHTER_SIM_THREAD=1 runs the match on a worker thread; the main thread only handles events and draws
+SIM_THREAD = os.environ.get("FIGHTER_SIM_THREAD") == "1"
+
+# Sprite frames are trimmed at load; FIGHTER_RLE_SPRITES=0 turns off RLE-accelerated blits for them
+RLE_SPRITES = os.environ.get("FIGHTER_RLE_SPRITES", "1") == "1"
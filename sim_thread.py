@@ -0,0 +1,213 @@
+import sys
+import threading
+import time
+from collections import deque
+from settings import FPS
+
+MAX_CATCH_UP = 5  # ticks; a simulation further behind than this drops the debt instead of racing
+
+
+class TickStats:
+    # Wall time of simulation ticks or rendered frames, in milliseconds. Totals cover the
+    # whole session; percentiles come from the most recent `history` samples.
+    def __init__(self, name, target_ms=None, history=600):
+        self.name = name
+        self.target_ms = target_ms
+        self.samples = deque(maxlen=history)
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.over = 0
+
+    def add(self, seconds):
+        sample = seconds * 1000
+        self.samples.append(sample)
+        self.count += 1
+        self.total += sample
+        self.worst = max(self.worst, sample)
+        if self.target_ms and sample > self.target_ms:
+            self.over += 1
+
+    def summary(self):
+        if not self.count:
+            return f"{self.name}: no samples"
+        samples = sorted(self.samples)
+        line = (f"{self.name}: {self.count} samples, mean {self.total / self.count:.2f} ms, "
+                f"p99 {samples[min(len(samples) - 1, int(len(samples) * 0.99))]:.2f} ms, max {self.worst:.2f} ms")
+        if self.target_ms:
+            line += f", {self.over} over {self.target_ms:.1f} ms"
+        return line
+
+
+class SimulationThread:
+    # Runs the match on a worker thread at a fixed tick rate. The main thread hands over
+    # controls with submit() and draws whatever latest() returns. Every tick publishes a
+    # new immutable Scene into the back slot of a double buffer and then flips the front
+    # index, so a frame is always drawn from one complete tick and never waits on the next.
+    # While paused or after game over nothing moves, so the worker sleeps until a press.
+    # An exception on the worker ends the loop and is kept in `error` for the main thread.
+    def __init__(self, game, tick_rate=FPS):
+        self.game = game
+        self.interval = 1 / tick_rate if tick_rate else 0
+        self.input_lock = threading.Lock()
+        self.pressed = 0
+        self.just_pressed = 0  # presses since the last tick, so none are lost between ticks
+        self.stamps = {}  # action -> drain time of those presses, for latency stats
+        self.pressed_event = threading.Event()  # wakes an idle worker
+        # Held for the whole of a tick; the main thread takes it to change shared assets
+        self.tick_lock = threading.Lock()
+        self.slots = [None, None]
+        self.front = 0
+        self.ticks = TickStats("Simulation ticks", self.interval * 1000 if self.interval else None)
+        self.late = 0
+        self.error = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name="simulation", daemon=True)
+        self.publish(game.snapshot(copy=True))
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.pressed_event.set()
+        self.thread.join()
+
+    def submit(self, pressed, just_pressed, stamps=None):
+        with self.input_lock:
+            self.pressed = pressed
+            self.just_pressed |= just_pressed
+            for action, stamp in (stamps or {}).items():
+                self.stamps.setdefault(action, stamp)
+            if just_pressed:
+                self.pressed_event.set()
+
+    def take_input(self):
+        with self.input_lock:
+            pressed, just_pressed, stamps = self.pressed, self.just_pressed, self.stamps
+            self.just_pressed = 0
+            self.stamps = {}
+            self.pressed_event.clear()
+        return pressed, just_pressed, stamps
+
+    def publish(self, scene):
+        back = 1 - self.front
+        self.slots[back] = scene
+        self.front = back
+
+    def latest(self):
+        return self.slots[self.front]
+
+    def tick(self):
+        # One loop frame of Game.run, reduced to a single tick fed from the main thread
+        game = self.game
+        with self.tick_lock:
+            if game.recorder:
+                game.recorder.keyframe(game)
+            pressed, just_pressed, stamps = self.take_input()
+            snapshot = game.input.feed(pressed, just_pressed)
+            for action, stamp in stamps.items():
+                game.input.event_times.setdefault(action, (stamp, snapshot.tick))
+            game.apply_system_input(snapshot)
+            game.update()
+            if game.recorder:
+                game.recorder.record(snapshot, 1)
+                if game.game_over:
+                    game.recorder.finish()
+            scene = game.snapshot(copy=True)
+        self.publish(scene)
+
+    def loop(self):
+        try:
+            self.run_ticks()
+        except BaseException as error:
+            self.error = error
+
+    def run_ticks(self):
+        next_tick = time.perf_counter()
+        while not self.stop_event.is_set():
+            if self.game.paused or self.game.game_over:
+                # Only a press can change anything now; the tick after it applies it
+                self.pressed_event.wait()
+                if self.stop_event.is_set():
+                    break
+                next_tick = time.perf_counter()
+            started = time.perf_counter()
+            self.tick()
+            self.ticks.add(time.perf_counter() - started)
+            if not self.interval:
+                # Unpaced, for benchmarks
+                continue
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self.stop_event.wait(delay)
+            elif -delay > self.interval * MAX_CATCH_UP:
+                self.late += 1
+                next_tick = time.perf_counter()
+
+    def summary(self):
+        return f"{self.ticks.summary()}, {self.late} times too far behind"
+
+
+def spin(milliseconds):
+    # Stand-in for heavy match logic: pure Python, so it holds the GIL like the real update does
+    end = time.perf_counter() + milliseconds / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def benchmark(seconds=5.0, spike_ms=40.0, spike_every=30):
+    # Presented frame intervals at 60 fps against the dummy display, with the simulation
+    # on the main thread and then on a worker. Every `spike_every` ticks the simulation
+    # takes an extra `spike_ms`, like a heavy AI decision or a round reset.
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game
+    from pacing import FramePacer
+
+    game = Game(seed=1)
+    update = game.update
+    count = [0]
+
+    def spiking_update():
+        update()
+        count[0] += 1
+        if count[0] % spike_every == 0:
+            spin(spike_ms)
+    game.update = spiking_update
+    start_state = game.capture_state()
+    frames = int(seconds * FPS)
+
+    # Everything on one thread: a slow tick holds up the frame that follows it
+    pacer = FramePacer(mode="sleep")
+    for _ in range(frames):
+        game.update()
+        game.draw()
+        pacer.wait(False)
+    print(f"Single thread:  {pacer.stats.summary()}, {count[0]} ticks")
+
+    # Worker thread: frames keep coming from the last published scene while a tick runs long
+    game.restore_state(start_state)
+    count[0] = 0
+    simulation = SimulationThread(game).start()
+    pacer = FramePacer(mode="sleep")
+    fresh = 0
+    last_scene = None
+    for _ in range(frames):
+        scene = simulation.latest()
+        fresh += scene is not last_scene
+        last_scene = scene
+        game.draw(scene)
+        pacer.wait(False)
+    simulation.stop()
+    print(f"Worker thread:  {pacer.stats.summary()}, {count[0]} ticks, {fresh} frames showed a new tick")
+    print(f"  {simulation.summary()}")
+    gil = "free-threaded" if not getattr(sys, "_is_gil_enabled", lambda: True)() else "with the GIL"
+    print(f"Python {sys.version.split()[0]} {gil}, {os.cpu_count()} CPUs")
+
+
+if __name__ == "__main__":
+    benchmark(spike_ms=float(sys.argv[1]) if len(sys.argv) > 1 else 40.0)
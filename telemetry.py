@@ -0,0 +1,157 @@
+import gzip
+import json
+import os
+import struct
+import threading
+import time
+
+# Event codes
+HIT = 1
+DAMAGE = 2
+TELEPORT = 3
+JUMP = 4
+AI_ACTION = 5
+ROUND_RESULT = 6
+EVENT_NAMES = {HIT: "hit", DAMAGE: "damage", TELEPORT: "teleport", JUMP: "jump",
+               AI_ACTION: "ai_action", ROUND_RESULT: "round_result"}
+
+# Actor codes
+PLAYER = 0
+ENEMY = 1
+ACTOR_NAMES = {PLAYER: "player", ENEMY: "enemy"}
+
+# Enumerations for AI records
+AI_ACTIONS = ["idle", "move_towards", "move_away", "jump", "attack"]
+AGGRESSION_LEVELS = ["normal", "aggressive", "defensive"]
+
+# Every record has the same fixed layout: tick, event, actor and three integer fields
+RECORD = struct.Struct("<IBBiii")
+FIELDS = ("tick", "event", "actor", "a", "b", "c")
+
+RING_CAPACITY = 1 << 16  # records, bounds memory at roughly a few MB
+MAX_FILE_BYTES = 8 * 1024 * 1024  # uncompressed bytes per file before rotating
+FLUSH_INTERVAL = 0.25  # seconds between writer batches
+
+
+class RingBuffer:
+    # Single-producer, single-consumer ring without locks: the game thread only moves
+    # `tail`, the writer thread only moves `head`, and each index is a single store
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+
+    def push(self, record):
+        tail = self.tail
+        if tail - self.head >= self.capacity:
+            # Backpressure: drop the newest record and count it
+            self.dropped += 1
+            return False
+        self.slots[tail % self.capacity] = record
+        self.tail = tail + 1  # publish after the slot is written
+        return True
+
+    def drain(self, limit=None):
+        head = self.head
+        count = self.tail - head
+        if limit is not None:
+            count = min(count, limit)
+        capacity = self.capacity
+        records = [self.slots[(head + i) % capacity] for i in range(count)]
+        self.head = head + count
+        return records
+
+    def __len__(self):
+        return self.tail - self.head
+
+
+class Telemetry:
+    # Game-thread API is record(); a background thread batches, compresses and rotates files
+    def __init__(self, directory="telemetry", fmt="jsonl", capacity=RING_CAPACITY,
+                 max_file_bytes=MAX_FILE_BYTES, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.fmt = fmt
+        self.max_file_bytes = max_file_bytes
+        self.flush_interval = flush_interval
+        self.ring = RingBuffer(capacity)
+        self.timers = None  # set by the game so records carry the simulation tick
+        self.written = 0
+        self.files = 0
+        self.file = None
+        self.file_bytes = 0
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.writer_loop, name="telemetry-writer", daemon=True)
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.thread.start()
+        return self
+
+    def record(self, event, actor, a=0, b=0, c=0):
+        # Cheap enough to call from the 60 Hz loop: one tuple and one ring store
+        tick = self.timers.now if self.timers is not None else 0
+        self.ring.push((tick, event, actor, int(a), int(b), int(c)))
+
+    def writer_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.write_batch()
+        self.write_batch()
+        self.close_file()
+
+    def write_batch(self):
+        records = self.ring.drain()
+        if not records:
+            return
+        if self.fmt == "binary":
+            data = b"".join(RECORD.pack(*record) for record in records)
+        else:
+            lines = []
+            for record in records:
+                entry = dict(zip(FIELDS, record))
+                entry["event"] = EVENT_NAMES.get(entry["event"], entry["event"])
+                entry["actor"] = ACTOR_NAMES.get(entry["actor"], entry["actor"])
+                lines.append(json.dumps(entry, separators=(",", ":")))
+            data = ("\n".join(lines) + "\n").encode()
+
+        try:
+            if self.file is None or self.file_bytes + len(data) > self.max_file_bytes:
+                self.rotate()
+            self.file.write(data)
+            self.file_bytes += len(data)
+            self.written += len(records)
+        except OSError as e:
+            print(f"Telemetry write failed: {e}")
+
+    def rotate(self):
+        self.close_file()
+        self.files += 1
+        extension = "bin" if self.fmt == "binary" else "jsonl"
+        path = os.path.join(self.directory, f"match-{self.session}-{self.files:04d}.{extension}.gz")
+        # Fast compression level, the writer must keep up with the game
+        self.file = gzip.open(path, "wb", compresslevel=1)
+        self.file_bytes = 0
+
+    def close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def close(self):
+        # Flush what is left and wait for the writer
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def summary(self):
+        return (f"Telemetry: {self.written} records written to {self.files} files, "
+                f"{self.ring.dropped} dropped")
+
+
+def read_binary(path):
+    # Decode a rotated binary telemetry file back into tuples
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    return [RECORD.unpack_from(data, offset) for offset in range(0, len(data), RECORD.size)]
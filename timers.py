@@ -0,0 +1,99 @@
+WHEEL_SIZE = 256  # slots, a little over four seconds of ticks per revolution
+
+
+class Timer:
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    # Hashed timing wheel driven by the simulation tick.
+    # Cooldowns that only need "is it over yet" are stored as deadlines against `now`
+    # and never scheduled; the wheel is for timers that must fire a callback.
+    def __init__(self, size=WHEEL_SIZE):
+        self.size = size
+        self.now = 0
+        self.slots = [[] for _ in range(size)]
+
+    def schedule(self, delay, callback, *args):
+        # Fire callback(*args) `delay` ticks from now (at least one tick)
+        timer = Timer(self.now + max(1, int(delay)), callback, args)
+        self.slots[timer.deadline % self.size].append(timer)
+        return timer
+
+    def advance(self):
+        # Move one tick forward and fire whatever expires on it
+        self.now += 1
+        slot = self.slots[self.now % self.size]
+        if not slot:
+            return
+
+        # Timers further than one revolution away stay in the slot
+        due = [timer for timer in slot if timer.deadline <= self.now]
+        if len(due) != len(slot):
+            slot[:] = [timer for timer in slot if timer.deadline > self.now]
+        else:
+            slot.clear()
+
+        for timer in due:
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+
+    def remaining(self, deadline):
+        return max(0, deadline - self.now)
+
+    def clear(self):
+        for slot in self.slots:
+            slot.clear()
+
+
+class Countdown:
+    # Attribute that reads as ticks remaining but is stored as a deadline on the owner's
+    # wheel (`owner.timers`), so nothing has to decrement it every tick
+    def __init__(self, allow_negative=False):
+        self.allow_negative = allow_negative
+
+    def __set_name__(self, owner, name):
+        self.field = name + "_deadline"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        left = getattr(obj, self.field) - obj.timers.now
+        return left if self.allow_negative else max(0, left)
+
+    def __set__(self, obj, value):
+        setattr(obj, self.field, obj.timers.now + value)
+
+
+REGEN_INTERVAL = 10  # ticks per regenerated point (6 HP per second)
+
+
+class RegeneratingHealth:
+    # Health computed lazily from the tick of the last change instead of ticked up.
+    # Regen starts `health_regen_delay` ticks after the last write and stops at max_health.
+    # While `regen_paused` is set (between rounds) health stays at the banked value.
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        base = obj.base_health
+        if base <= 0 or base >= obj.max_health or obj.regen_paused:
+            return base
+        elapsed = obj.timers.now - obj.last_hit_tick - obj.health_regen_delay
+        if elapsed < 0:
+            return base
+        return min(obj.max_health, base + elapsed // REGEN_INTERVAL + 1)
+
+    def __set__(self, obj, value):
+        # Any write (damage, reset) restarts the regen delay
+        obj.base_health = value
+        obj.last_hit_tick = obj.timers.now
+        obj.regen_paused = False